@@ -1,12 +1,19 @@
 """TOU schedule integration."""
 from __future__ import annotations
 
-from datetime import timedelta
+from datetime import datetime, timedelta
 import logging
+from time import perf_counter
 from typing import Any
 
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.core import HomeAssistant
+from homeassistant.const import EVENT_HOMEASSISTANT_STOP
+from homeassistant.core import CALLBACK_TYPE, Event, HomeAssistant, callback
+from homeassistant.helpers.typing import ConfigType
+from homeassistant.helpers import config_validation as cv, entity_registry as er
+from homeassistant.helpers.debounce import Debouncer
+from homeassistant.helpers.dispatcher import async_dispatcher_send
+from homeassistant.helpers.event import async_track_point_in_time
 from homeassistant.helpers.update_coordinator import DataUpdateCoordinator, UpdateFailed
 from homeassistant.util import dt as dt_util
 
@@ -14,22 +21,53 @@ from .const import (
     ATTR_ACTIVE_RATE_TYPE_ID,
     ATTR_ACTIVE_RATE_TYPE,
     ATTR_ACTIVE_RULE,
+    ATTR_CHEAPEST_WINDOW,
     ATTR_NEXT_TRANSITION,
     ATTR_PRICES_TODAY,
     ATTR_PRICES_TOMORROW,
+    CONF_CHEAPEST_WINDOW_HOURS,
     CONF_DEFAULT,
     CONF_ID,
     CONF_NAME,
     CONF_RATE,
+    CONF_PRICE_RESOLUTION,
     CONF_RATE_TYPES,
-    CONF_RULES,
+    CONF_REFRESH_MODE,
+    DEFAULT_CHEAPEST_WINDOW_HOURS,
+    DEFAULT_PRICE_RESOLUTION,
+    DEFAULT_REFRESH_MODE,
     DOMAIN,
+    NEXT_TRANSITION_LIMIT_HOURS,
     PLATFORMS,
+    POLL_INTERVAL,
+    PRICE_RESOLUTION_CHANGES,
+    RATE_UPDATE_COOLDOWN,
+    REFRESH_MODE_POLL,
+    SIGNAL_OPTIONS_UPDATED,
+    STAGE_ACTIVE_RATE,
+    STAGE_CHEAPEST_WINDOW,
+    STAGE_COMPILE,
+    STAGE_NEXT_TRANSITION,
+    STAGE_OPTIONS,
+    STAGE_PRICES,
+    STAGE_TOTAL,
+    STAGE_VALIDATION,
+    WATCHDOG_INTERVAL,
 )
-from .helpers import get_options
-from .scheduler import ActiveRate, build_prices_for_day, get_active_rate, local_midnight, next_transition
+from .cost import CheapestWindow, WindowCache
+from .helpers import RefreshTimings, get_options
+from .scheduler import (
+    ActiveRate,
+    CompiledSchedule,
+    DayPriceCache,
+    local_day_start,
+    local_midnight,
+)
+from .services import async_setup_services
 from .validation import validate_rate_types
 
+CONFIG_SCHEMA = cv.config_entry_only_config_schema(DOMAIN)
+
 DEFAULT_RATE_TYPE = {
     CONF_ID: "default",
     CONF_NAME: "Default",
@@ -40,34 +78,188 @@ DEFAULT_RATE_TYPE = {
 
 LOGGER = logging.getLogger(__name__)
 
+LEGACY_UNIQUE_ID_PREFIX = "tou_"
+
 
 class TouScheduleCoordinator(DataUpdateCoordinator[dict[str, Any]]):
-    """Coordinator for TOU schedule."""
+    """Coordinator for TOU schedule.
+
+    A refresh is always scheduled for the exact instant of the next rate
+    transition or local midnight, whichever comes first, so states flip at the
+    boundary rather than on the next poll. In poll mode the data is also
+    rebuilt every minute; in transition mode the update interval only acts as
+    a watchdog. Listeners are only notified when the data differs from the
+    previous refresh; cached price lists keep their identity, so the
+    comparison is cheap.
+    """
 
     def __init__(self, hass: HomeAssistant, entry: ConfigEntry) -> None:
+        self.refresh_mode = entry.options.get(CONF_REFRESH_MODE, DEFAULT_REFRESH_MODE)
         super().__init__(
             hass,
             logger=LOGGER,
             name=f"{DOMAIN}_{entry.entry_id}",
-            update_interval=timedelta(minutes=1),
+            update_interval=self._update_interval_for_mode(),
+            always_update=False,
         )
         self.entry = entry
+        self._unsub_transition: CALLBACK_TYPE | None = None
+        self._transition_at: datetime | None = None
+        self._cancel_interval_refresh: CALLBACK_TYPE | None = None
+        self.schedule: CompiledSchedule | None = None
+        self._schedule_options: Any = None
+        self._price_cache = DayPriceCache()
+        self._window_cache = WindowCache()
+        # Kept out of the coordinator data so timings never trigger updates.
+        self.timings = RefreshTimings()
+        self._pending_rates: dict[str, float] = {}
+        self._rate_debouncer = Debouncer(
+            hass,
+            LOGGER,
+            cooldown=RATE_UPDATE_COOLDOWN,
+            immediate=False,
+            function=self._async_write_rates,
+        )
+
+    def _update_interval_for_mode(self) -> timedelta:
+        if self.refresh_mode == REFRESH_MODE_POLL:
+            return POLL_INTERVAL
+        return WATCHDOG_INTERVAL
+
+    async def async_apply_options(self) -> None:
+        """Swap in the schedule from updated entry options and refresh."""
+        self.refresh_mode = self.entry.options.get(CONF_REFRESH_MODE, DEFAULT_REFRESH_MODE)
+        self.update_interval = self._update_interval_for_mode()
+        await self.async_refresh()
+
+    def pending_rate(self, rate_type_id: str) -> float | None:
+        """Return a rate that is queued but not yet written to the options."""
+        return self._pending_rates.get(rate_type_id)
+
+    async def async_set_rates(self, rates: dict[str, float], immediate: bool = False) -> None:
+        """Queue rate changes and write them in a single options update.
+
+        The queue is written once the debounce cooldown after the first
+        change has passed, so a burst becomes a single options update and a
+        single recompute. With ``immediate`` the queue, including the new
+        rates, is written now.
+        """
+        unknown = set(rates) - {
+            rate_type[CONF_ID] for rate_type in self.entry.options.get(CONF_RATE_TYPES, [])
+        }
+        if unknown:
+            raise ValueError(f"Unknown rate type: {', '.join(sorted(unknown))}")
+        self._pending_rates.update({key: float(value) for key, value in rates.items()})
+        if immediate:
+            await self.async_flush_rates()
+        else:
+            await self._rate_debouncer.async_call()
+
+    async def async_flush_rates(self, _event: Event | None = None) -> None:
+        """Write queued rate changes now instead of after the cooldown."""
+        self._rate_debouncer.async_cancel()
+        await self._async_write_rates()
+
+    async def _async_write_rates(self) -> None:
+        if not self._pending_rates:
+            return
+        pending, self._pending_rates = self._pending_rates, {}
+        options = dict(self.entry.options)
+        options[CONF_RATE_TYPES] = [
+            {**rate_type, CONF_RATE: pending[rate_type[CONF_ID]]}
+            if rate_type[CONF_ID] in pending
+            else rate_type
+            for rate_type in options.get(CONF_RATE_TYPES, [])
+        ]
+        self.hass.config_entries.async_update_entry(self.entry, options=options)
+
+    def _price_resolution(self) -> int | None:
+        """Return the price slot length in minutes, or None for change points."""
+        value = self.entry.options.get(CONF_PRICE_RESOLUTION, DEFAULT_PRICE_RESOLUTION)
+        if value == PRICE_RESOLUTION_CHANGES:
+            return None
+        return int(value)
+
+    def find_cheapest_window(
+        self,
+        start: datetime,
+        end: datetime,
+        duration: timedelta,
+        contiguous: bool = True,
+    ) -> CheapestWindow | None:
+        """Return the cheapest window, cached until the schedule changes."""
+        return self._window_cache.find_cheapest_window(
+            self.get_schedule(), start, end, duration, contiguous
+        )
+
+    def get_schedule(self) -> CompiledSchedule:
+        """Return the compiled schedule, recompiling only when options change."""
+        if self.schedule is None or self._schedule_options is not self.entry.options:
+            with self.timings.measure(STAGE_OPTIONS):
+                rate_types, rules = get_options(self.entry)
+            with self.timings.measure(STAGE_VALIDATION):
+                validation = validate_rate_types(rate_types)
+            if not validation.valid:
+                raise UpdateFailed(validation.message or "Invalid rate types")
+            try:
+                with self.timings.measure(STAGE_COMPILE):
+                    self.schedule = CompiledSchedule(rate_types, rules, lookup_table=True)
+            except ValueError as err:
+                raise UpdateFailed(str(err)) from err
+            if self.schedule.table is None:
+                LOGGER.debug("Schedule lookup table unavailable; using interval lookups")
+            else:
+                LOGGER.debug("Schedule lookup table: %s", self.schedule.table.memory_report())
+            self._schedule_options = self.entry.options
+        return self.schedule
 
     async def _async_update_data(self) -> dict[str, Any]:
-        rate_types, rules = get_options(self.entry)
-        validation = validate_rate_types(rate_types)
-        if not validation.valid:
-            raise UpdateFailed(validation.message or "Invalid rate types")
+        started = perf_counter()
+        schedule = self.get_schedule()
 
         now = dt_util.now()
-        active_rate = get_active_rate(rules, rate_types, now)
+        if self._transition_at is not None:
+            # Never evaluate a transition refresh before its boundary, even if
+            # the wall clock lags the timer slightly.
+            now = max(now, self._transition_at)
+            self._transition_at = None
+        with self.timings.measure(STAGE_ACTIVE_RATE):
+            active_rate = schedule.rate_at(now)
         midnight = local_midnight(now)
         tzinfo = dt_util.get_time_zone(self.hass.config.time_zone)
-        prices_today = build_prices_for_day(midnight, rules, rate_types, tzinfo)
-        prices_tomorrow = build_prices_for_day(midnight + timedelta(days=1), rules, rate_types, tzinfo)
-        next_change = next_transition(rules, rate_types, now)
+        tomorrow = local_day_start(midnight.date() + timedelta(days=1), tzinfo)
+        resolution = self._price_resolution()
+        with self.timings.measure(STAGE_PRICES):
+            prices_today = self._price_cache.prices_for_day(
+                schedule, midnight, tzinfo, resolution
+            )
+            prices_tomorrow = self._price_cache.prices_for_day(
+                schedule, tomorrow, tzinfo, resolution
+            )
+        with self.timings.measure(STAGE_NEXT_TRANSITION):
+            next_change = schedule.next_transition(now, NEXT_TRANSITION_LIMIT_HOURS)
+        with self.timings.measure(STAGE_CHEAPEST_WINDOW):
+            cheapest_window = self.find_cheapest_window(
+                now,
+                local_day_start(midnight.date() + timedelta(days=2), tzinfo),
+                timedelta(
+                    hours=self.entry.options.get(
+                        CONF_CHEAPEST_WINDOW_HOURS, DEFAULT_CHEAPEST_WINDOW_HOURS
+                    )
+                ),
+            )
+        # Compare instants in UTC; aware datetimes sharing a zone compare by
+        # wall clock, which is ambiguous in a repeated hour.
+        next_refresh = dt_util.as_utc(tomorrow)
+        if next_change is not None and dt_util.as_utc(next_change) < next_refresh:
+            next_refresh = dt_util.as_utc(next_change)
+        self._schedule_transition_refresh(next_refresh)
+        self.timings.record(STAGE_TOTAL, perf_counter() - started)
 
         return {
+            # Notifies listeners of schedule changes that leave the values
+            # below as they were, such as a rule for another season.
+            "fingerprint": schedule.fingerprint,
             "active_rate": active_rate,
             ATTR_ACTIVE_RULE: active_rate.rule_id,
             ATTR_ACTIVE_RATE_TYPE: active_rate.rate_type_name,
@@ -75,8 +267,47 @@ class TouScheduleCoordinator(DataUpdateCoordinator[dict[str, Any]]):
             ATTR_NEXT_TRANSITION: next_change.isoformat() if next_change else None,
             ATTR_PRICES_TODAY: prices_today,
             ATTR_PRICES_TOMORROW: prices_tomorrow,
+            ATTR_CHEAPEST_WINDOW: cheapest_window,
         }
 
+    @callback
+    def _schedule_refresh(self) -> None:
+        # An interval refresh that starts after a transition refresh has
+        # already rescheduled clears the new timer without cancelling it, so
+        # keep our own handle and cancel it before scheduling the next one.
+        if self._cancel_interval_refresh is not None:
+            self._cancel_interval_refresh()
+            self._cancel_interval_refresh = None
+        super()._schedule_refresh()
+        self._cancel_interval_refresh = self._unsub_refresh
+
+    def _schedule_transition_refresh(self, point_in_time: datetime) -> None:
+        self._cancel_transition_refresh()
+        self._unsub_transition = async_track_point_in_time(
+            self.hass, self._async_handle_transition, point_in_time
+        )
+
+    def _cancel_transition_refresh(self) -> None:
+        if self._unsub_transition is not None:
+            self._unsub_transition()
+            self._unsub_transition = None
+
+    async def _async_handle_transition(self, boundary: datetime) -> None:
+        # The point in time helper passes the scheduled instant, not the
+        # time the timer actually ran. The fired timer is left in
+        # _unsub_transition: another refresh may already have replaced it,
+        # and cancelling a fired timer is harmless.
+        self._transition_at = boundary
+        await self.async_refresh()
+
+    async def async_shutdown(self) -> None:
+        self._cancel_transition_refresh()
+        if self._cancel_interval_refresh is not None:
+            self._cancel_interval_refresh()
+            self._cancel_interval_refresh = None
+        await super().async_shutdown()
+        await self.async_flush_rates()
+
 
 def _ensure_default_rate_type(hass: HomeAssistant, entry: ConfigEntry) -> None:
     options = dict(entry.options)
@@ -101,7 +332,30 @@ def get_active_rate_type(coordinator: TouScheduleCoordinator) -> ActiveRate:
     return coordinator.data["active_rate"]
 
 
+async def async_setup(hass: HomeAssistant, config: ConfigType) -> bool:
+    async_setup_services(hass)
+    return True
+
+
+async def _async_migrate_unique_ids(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Scope legacy ``tou_*`` unique IDs to the entry.
+
+    Sensors and binary sensors used global unique IDs, which made every entry
+    after the first one fail to add its entities.
+    """
+
+    @callback
+    def _migrate(registry_entry: er.RegistryEntry) -> dict[str, str] | None:
+        if not registry_entry.unique_id.startswith(LEGACY_UNIQUE_ID_PREFIX):
+            return None
+        suffix = registry_entry.unique_id.removeprefix(LEGACY_UNIQUE_ID_PREFIX)
+        return {"new_unique_id": f"{entry.entry_id}_{suffix}"}
+
+    await er.async_migrate_entries(hass, entry.entry_id, _migrate)
+
+
 async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
+    await _async_migrate_unique_ids(hass, entry)
     _ensure_default_rate_type(hass, entry)
     _ensure_default_rate_selection(hass, entry)
     coordinator = TouScheduleCoordinator(hass, entry)
@@ -109,6 +363,9 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     hass.data.setdefault(DOMAIN, {})[entry.entry_id] = coordinator
     await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
     entry.async_on_unload(entry.add_update_listener(_update_listener))
+    entry.async_on_unload(
+        hass.bus.async_listen_once(EVENT_HOMEASSISTANT_STOP, coordinator.async_flush_rates)
+    )
     return True
 
 
@@ -120,4 +377,7 @@ async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
 
 
 async def _update_listener(hass: HomeAssistant, entry: ConfigEntry) -> None:
-    await hass.config_entries.async_reload(entry.entry_id)
+    """Hot-swap the schedule; platforms add or remove entities on the signal."""
+    coordinator: TouScheduleCoordinator = hass.data[DOMAIN][entry.entry_id]
+    await coordinator.async_apply_options()
+    async_dispatcher_send(hass, SIGNAL_OPTIONS_UPDATED.format(entry.entry_id))
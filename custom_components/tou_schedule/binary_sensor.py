@@ -3,7 +3,9 @@ from __future__ import annotations
 
 from homeassistant.components.binary_sensor import BinarySensorEntity
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.core import HomeAssistant
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers import entity_registry as er
+from homeassistant.helpers.dispatcher import async_dispatcher_connect
 from homeassistant.helpers.entity import DeviceInfo
 from homeassistant.helpers.update_coordinator import CoordinatorEntity
 
@@ -17,8 +19,9 @@ from .const import (
     CONF_RATE_TYPE,
     CONF_WEEKDAYS,
     DOMAIN,
+    SIGNAL_OPTIONS_UPDATED,
 )
-from .helpers import get_options
+from .helpers import get_options, get_options_snapshot
 
 
 async def async_setup_entry(
@@ -27,15 +30,35 @@ async def async_setup_entry(
     async_add_entities,
 ) -> None:
     coordinator: TouScheduleCoordinator = hass.data[DOMAIN][entry.entry_id]
-    rate_types, rules = get_options(entry)
-    entities = [
-        TouRateTypeBinarySensor(coordinator, entry, rate_type)
-        for rate_type in rate_types
-    ]
-    entities.extend(
-        TouRuleBinarySensor(coordinator, entry, rule, rate_types) for rule in rules
+    known_rate_types: set[str] = set()
+    known_rules: set[str] = set()
+
+    @callback
+    def _async_add_new_entities() -> None:
+        rate_types, rules = get_options(entry)
+        entities: list[BinarySensorEntity] = [
+            TouRateTypeBinarySensor(coordinator, entry, rate_type)
+            for rate_type in rate_types
+            if rate_type[CONF_ID] not in known_rate_types
+        ]
+        entities.extend(
+            TouRuleBinarySensor(coordinator, entry, rule, rate_types)
+            for rule in rules
+            if rule[CONF_ID] not in known_rules
+        )
+        known_rate_types.clear()
+        known_rate_types.update(rate_type[CONF_ID] for rate_type in rate_types)
+        known_rules.clear()
+        known_rules.update(rule[CONF_ID] for rule in rules)
+        if entities:
+            async_add_entities(entities)
+
+    _async_add_new_entities()
+    entry.async_on_unload(
+        async_dispatcher_connect(
+            hass, SIGNAL_OPTIONS_UPDATED.format(entry.entry_id), _async_add_new_entities
+        )
     )
-    async_add_entities(entities)
 
 
 class TouRateTypeBinarySensor(CoordinatorEntity[TouScheduleCoordinator], BinarySensorEntity):
@@ -48,14 +71,34 @@ class TouRateTypeBinarySensor(CoordinatorEntity[TouScheduleCoordinator], BinaryS
         rate_type: dict,
     ) -> None:
         super().__init__(coordinator)
+        self._entry = entry
         self._rate_type_id = rate_type[CONF_ID]
         self._attr_name = f"TOU Rate {rate_type[CONF_NAME]}"
-        self._attr_unique_id = f"tou_rate_{self._rate_type_id}"
+        self._attr_unique_id = f"{entry.entry_id}_rate_{self._rate_type_id}"
         self._attr_device_info = DeviceInfo(
             identifiers={(DOMAIN, entry.entry_id)},
             name="TOU Schedule",
         )
 
+    async def async_added_to_hass(self) -> None:
+        await super().async_added_to_hass()
+        self.async_on_remove(
+            async_dispatcher_connect(
+                self.hass,
+                SIGNAL_OPTIONS_UPDATED.format(self._entry.entry_id),
+                self._handle_options_update,
+            )
+        )
+
+    @callback
+    def _handle_options_update(self) -> None:
+        rate_type = get_options_snapshot(self._entry).rate_types_by_id.get(self._rate_type_id)
+        if rate_type is None:
+            er.async_get(self.hass).async_remove(self.entity_id)
+            return
+        self._attr_name = f"TOU Rate {rate_type[CONF_NAME]}"
+        self.async_write_ha_state()
+
     @property
     def is_on(self) -> bool:
         return get_active_rate_type(self.coordinator).rate_type_id == self._rate_type_id
@@ -72,11 +115,12 @@ class TouRuleBinarySensor(CoordinatorEntity[TouScheduleCoordinator], BinarySenso
         rate_types: list[dict],
     ) -> None:
         super().__init__(coordinator)
+        self._entry = entry
         self._rule_id = rule[CONF_ID]
         self._rule = rule
         self._rate_type_name = self._resolve_rate_type_name(rate_types)
         self._attr_name = f"TOU Rule {rule[CONF_NAME]}"
-        self._attr_unique_id = f"tou_rule_{self._rule_id}"
+        self._attr_unique_id = f"{entry.entry_id}_rule_{self._rule_id}"
         self._attr_device_info = DeviceInfo(
             identifiers={(DOMAIN, entry.entry_id)},
             name="TOU Schedule",
@@ -88,6 +132,28 @@ class TouRuleBinarySensor(CoordinatorEntity[TouScheduleCoordinator], BinarySenso
                 return rate_type[CONF_NAME]
         return None
 
+    async def async_added_to_hass(self) -> None:
+        await super().async_added_to_hass()
+        self.async_on_remove(
+            async_dispatcher_connect(
+                self.hass,
+                SIGNAL_OPTIONS_UPDATED.format(self._entry.entry_id),
+                self._handle_options_update,
+            )
+        )
+
+    @callback
+    def _handle_options_update(self) -> None:
+        snapshot = get_options_snapshot(self._entry)
+        rule = snapshot.rules_by_id.get(self._rule_id)
+        if rule is None:
+            er.async_get(self.hass).async_remove(self.entity_id)
+            return
+        self._rule = rule
+        self._rate_type_name = self._resolve_rate_type_name(list(snapshot.rate_types))
+        self._attr_name = f"TOU Rule {rule[CONF_NAME]}"
+        self.async_write_ha_state()
+
     @property
     def is_on(self) -> bool:
         return self.coordinator.data.get(ATTR_ACTIVE_RULE) == self._rule_id
@@ -1,32 +1,46 @@
 """Config flow for TOU schedule."""
 from __future__ import annotations
 
+from copy import deepcopy
 import logging
 import uuid
 from typing import Any
 
 import voluptuous as vol
+import yaml
 
 from homeassistant import config_entries
 from homeassistant.core import callback
 from homeassistant.helpers import selector
+from homeassistant.util import dt as dt_util
+from homeassistant.util.yaml import dump
 
 from .const import (
+    CONF_CHEAPEST_WINDOW_HOURS,
     CONF_DEFAULT,
     CONF_END,
     CONF_ID,
     CONF_MONTHS,
     CONF_NAME,
     CONF_PERIODS,
+    CONF_PRICE_RESOLUTION,
     CONF_RATE,
     CONF_RATE_TYPE,
+    CONF_REFRESH_MODE,
     CONF_RULES,
     CONF_START,
+    CONF_TARIFF,
     CONF_WEEKDAYS,
     CONF_RATE_TYPES,
+    DEFAULT_CHEAPEST_WINDOW_HOURS,
+    DEFAULT_PRICE_RESOLUTION,
+    DEFAULT_REFRESH_MODE,
     DOMAIN,
+    PRICE_RESOLUTION_CHANGES,
+    REFRESH_MODE_POLL,
+    REFRESH_MODE_TRANSITION,
 )
-from .validation import validate_rate_types, validate_rules
+from .validation import RuleOccupancyIndex, ValidationResult, validate_rate_types, validate_rules
 
 MONTH_OPTIONS = {
     1: "January",
@@ -53,9 +67,63 @@ WEEKDAY_OPTIONS = {
     6: "Sunday",
 }
 
+REFRESH_MODE_OPTIONS = {
+    REFRESH_MODE_TRANSITION: "At rate transitions",
+    REFRESH_MODE_POLL: "Every minute",
+}
+
+PRICE_RESOLUTION_OPTIONS = {
+    "15": "15 minutes",
+    "30": "30 minutes",
+    "60": "1 hour",
+    PRICE_RESOLUTION_CHANGES: "Only when the price changes",
+}
+
 _LOGGER = logging.getLogger(__name__)
 
 
+def _time_string(value: Any) -> str:
+    value = str(value)
+    if dt_util.parse_time(value) is None:
+        raise vol.Invalid(f"Invalid time: {value}")
+    return value
+
+
+TARIFF_SCHEMA = vol.Schema(
+    {
+        vol.Required(CONF_RATE_TYPES): [
+            vol.Schema(
+                {
+                    vol.Required(CONF_ID): vol.Coerce(str),
+                    vol.Required(CONF_NAME): vol.Coerce(str),
+                    vol.Required(CONF_RATE): vol.Coerce(float),
+                    vol.Optional(CONF_DEFAULT, default=False): bool,
+                }
+            )
+        ],
+        vol.Optional(CONF_RULES, default=[]): [
+            vol.Schema(
+                {
+                    vol.Optional(CONF_ID): vol.Coerce(str),
+                    vol.Required(CONF_NAME): vol.Coerce(str),
+                    vol.Required(CONF_RATE_TYPE): vol.Coerce(str),
+                    vol.Optional(CONF_MONTHS, default=[]): [vol.All(int, vol.Range(min=1, max=12))],
+                    vol.Optional(CONF_WEEKDAYS, default=[]): [vol.All(int, vol.Range(min=0, max=6))],
+                    vol.Optional(CONF_PERIODS, default=[]): [
+                        vol.Schema(
+                            {
+                                vol.Required(CONF_START): _time_string,
+                                vol.Required(CONF_END): _time_string,
+                            }
+                        )
+                    ],
+                }
+            )
+        ],
+    }
+)
+
+
 
 class TouScheduleConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
     """Handle a config flow for TOU schedule."""
@@ -78,10 +146,11 @@ class TouScheduleOptionsFlow(config_entries.OptionsFlow):
 
     def __init__(self, config_entry: config_entries.ConfigEntry) -> None:
         self._config_entry = config_entry
-        self._options = dict(config_entry.options)
+        self._options = deepcopy(dict(config_entry.options))
         self._rate_type_id: str | None = None
         self._rule_id: str | None = None
         self._period_index: int | None = None
+        self._occupancy: RuleOccupancyIndex | None = None
 
     @property
     def _rate_types(self) -> list[dict[str, Any]]:
@@ -105,6 +174,12 @@ class TouScheduleOptionsFlow(config_entries.OptionsFlow):
             user_input,
         )
 
+    def _validate_rule(self, rule: dict[str, Any]) -> ValidationResult:
+        """Validate one added or edited rule against the other rules."""
+        if self._occupancy is None or self._occupancy.rule_id != rule[CONF_ID]:
+            self._occupancy = RuleOccupancyIndex(self._rules, rule[CONF_ID])
+        return self._occupancy.validate_rule(rule, self._rate_types, full_report=True)
+
     def _normalize_rate_types(self, rate_types: list[dict[str, Any]]) -> None:
         """Ensure exactly one default rate type is selected."""
         defaults = [rate for rate in rate_types if rate.get(CONF_DEFAULT)]
@@ -127,7 +202,11 @@ class TouScheduleOptionsFlow(config_entries.OptionsFlow):
 
     async def _save_options(self, return_step: str = "init"):
         self._log_step("_save_options", {"return_step": return_step})
-        self.hass.config_entries.async_update_entry(self._config_entry, options=self._options)
+        # Save a copy so later in-place edits are seen as changes by the
+        # update listener.
+        self.hass.config_entries.async_update_entry(
+            self._config_entry, options=deepcopy(self._options)
+        )
         if return_step == "rate_types":
             return await self.async_step_rate_types()
         if return_step == "rules":
@@ -140,8 +219,106 @@ class TouScheduleOptionsFlow(config_entries.OptionsFlow):
             return await self.async_step_default_rate()
         return self.async_show_menu(
             step_id="init",
-            menu_options=["rate_types", "rules"],
+            menu_options=["rate_types", "rules", "settings", "tariff_import", "tariff_export"],
+        )
+
+    async def async_step_tariff_import(self, user_input: dict[str, Any] | None = None):
+        self._log_step("tariff_import", user_input)
+        errors: dict[str, str] = {}
+        if user_input is not None:
+            try:
+                # safe_load, not the config loader: pasted text must not
+                # resolve !include, !secret or !env_var tags.
+                tariff = TARIFF_SCHEMA(yaml.safe_load(user_input[CONF_TARIFF]))
+            except (yaml.YAMLError, vol.Invalid) as err:
+                errors["base"] = f"Invalid tariff document: {err}"
+            else:
+                rate_types = tariff[CONF_RATE_TYPES]
+                rules = tariff[CONF_RULES]
+                for rule in rules:
+                    rule.setdefault(CONF_ID, str(uuid.uuid4()))
+                validation = validate_rate_types(rate_types)
+                if validation.valid:
+                    validation = validate_rules(rules, rate_types, full_report=True)
+                if validation.valid:
+                    self._options[CONF_RATE_TYPES] = rate_types
+                    self._options[CONF_RULES] = rules
+                    self._occupancy = None
+                    return await self._save_options(return_step="init")
+                errors["base"] = validation.message or "invalid"
+
+        schema = vol.Schema(
+            {
+                vol.Required(CONF_TARIFF): selector.TextSelector(
+                    selector.TextSelectorConfig(multiline=True)
+                ),
+            }
+        )
+        return self.async_show_form(step_id="tariff_import", data_schema=schema, errors=errors)
+
+    async def async_step_tariff_export(self, user_input: dict[str, Any] | None = None):
+        self._log_step("tariff_export", None)
+        if user_input is not None:
+            return await self.async_step_init()
+        tariff = {CONF_RATE_TYPES: self._rate_types, CONF_RULES: self._rules}
+        return self.async_show_form(
+            step_id="tariff_export",
+            data_schema=vol.Schema({}),
+            description_placeholders={CONF_TARIFF: dump(tariff)},
+        )
+
+    async def async_step_settings(self, user_input: dict[str, Any] | None = None):
+        self._log_step("settings", user_input)
+        if user_input is not None:
+            self._options[CONF_REFRESH_MODE] = user_input[CONF_REFRESH_MODE]
+            self._options[CONF_PRICE_RESOLUTION] = user_input[CONF_PRICE_RESOLUTION]
+            self._options[CONF_CHEAPEST_WINDOW_HOURS] = float(
+                user_input[CONF_CHEAPEST_WINDOW_HOURS]
+            )
+            return await self._save_options(return_step="init")
+
+        refresh_mode_options = [
+            {"label": label, "value": value} for value, label in REFRESH_MODE_OPTIONS.items()
+        ]
+        price_resolution_options = [
+            {"label": label, "value": value} for value, label in PRICE_RESOLUTION_OPTIONS.items()
+        ]
+        schema = vol.Schema(
+            {
+                vol.Required(
+                    CONF_REFRESH_MODE,
+                    default=self._options.get(CONF_REFRESH_MODE, DEFAULT_REFRESH_MODE),
+                ): selector.SelectSelector(
+                    selector.SelectSelectorConfig(
+                        options=refresh_mode_options, mode=selector.SelectSelectorMode.DROPDOWN
+                    )
+                ),
+                vol.Required(
+                    CONF_PRICE_RESOLUTION,
+                    default=self._options.get(CONF_PRICE_RESOLUTION, DEFAULT_PRICE_RESOLUTION),
+                ): selector.SelectSelector(
+                    selector.SelectSelectorConfig(
+                        options=price_resolution_options,
+                        mode=selector.SelectSelectorMode.DROPDOWN,
+                    )
+                ),
+                vol.Required(
+                    CONF_CHEAPEST_WINDOW_HOURS,
+                    default=self._options.get(
+                        CONF_CHEAPEST_WINDOW_HOURS, DEFAULT_CHEAPEST_WINDOW_HOURS
+                    ),
+                ): selector.NumberSelector(
+                    selector.NumberSelectorConfig(
+                        min=0.25,
+                        max=24,
+                        step=0.25,
+                        unit_of_measurement="h",
+                        mode=selector.NumberSelectorMode.BOX,
+                    )
+                ),
+            }
         )
+        return self.async_show_form(step_id="settings", data_schema=schema)
 
     async def async_step_default_rate(self, user_input: dict[str, Any] | None = None):
         self._log_step("default_rate", user_input)
@@ -309,6 +486,7 @@ class TouScheduleOptionsFlow(config_entries.OptionsFlow):
 
     async def async_step_rules(self, user_input: dict[str, Any] | None = None):
         self._log_step("rules", user_input)
+        self._occupancy = None
         return self.async_show_menu(
             step_id="rules",
             menu_options=["rule_add", "rule_edit", "rule_delete", "back"],
@@ -334,7 +512,7 @@ class TouScheduleOptionsFlow(config_entries.OptionsFlow):
                 CONF_PERIODS: [],
             }
             rules = self._rules + [rule]
-            validation = validate_rules(rules, self._rate_types)
+            validation = self._validate_rule(rule)
             if validation.valid:
                 self._options[CONF_RULES] = rules
                 self._rule_id = rule_id
@@ -388,7 +566,7 @@ class TouScheduleOptionsFlow(config_entries.OptionsFlow):
                     CONF_WEEKDAYS: [int(value) for value in user_input.get(CONF_WEEKDAYS, [])],
                 }
             )
-            validation = validate_rules(rules, self._rate_types)
+            validation = self._validate_rule(rule)
             if validation.valid:
                 self._options[CONF_RULES] = rules
                 return await self.async_step_rule_periods_menu()
@@ -405,6 +583,7 @@ class TouScheduleOptionsFlow(config_entries.OptionsFlow):
                 return await self.async_step_rules()
             rule_id = user_input[CONF_ID]
             self._options[CONF_RULES] = [rule for rule in self._rules if rule[CONF_ID] != rule_id]
+            self._occupancy = None
             return await self._save_options(return_step="rules")
 
         if not self._rules:
@@ -484,7 +663,7 @@ class TouScheduleOptionsFlow(config_entries.OptionsFlow):
         if user_input is not None:
             index = int(user_input["index"])
             removed = rule[CONF_PERIODS].pop(index)
-            validation = validate_rules(self._rules, self._rate_types)
+            validation = self._validate_rule(rule)
             if validation.valid:
                 return await self.async_step_rule_periods_menu()
             rule[CONF_PERIODS].insert(index, removed)
@@ -572,7 +751,7 @@ class TouScheduleOptionsFlow(config_entries.OptionsFlow):
             else:
                 periods[self._period_index] = new_period
             rule[CONF_PERIODS] = periods
-            validation = validate_rules(self._rules, self._rate_types)
+            validation = self._validate_rule(rule)
             if validation.valid:
                 return await self.async_step_rule_periods_menu()
             errors["base"] = validation.message or "invalid"
@@ -1,4 +1,5 @@
 """Constants for the TOU schedule integration."""
+from datetime import timedelta
 
 DOMAIN = "tou_schedule"
 PLATFORMS = ["sensor", "binary_sensor", "number"]
@@ -16,6 +17,40 @@ CONF_WEEKDAYS = "weekdays"
 CONF_PERIODS = "periods"
 CONF_START = "start"
 CONF_END = "end"
+CONF_REFRESH_MODE = "refresh_mode"
+CONF_TARIFF = "tariff"
+CONF_PRICE_RESOLUTION = "price_resolution"
+CONF_CHEAPEST_WINDOW_HOURS = "cheapest_window_hours"
+
+REFRESH_MODE_POLL = "poll"
+REFRESH_MODE_TRANSITION = "transition"
+DEFAULT_REFRESH_MODE = REFRESH_MODE_TRANSITION
+
+PRICE_RESOLUTION_CHANGES = "changes"
+DEFAULT_PRICE_RESOLUTION = "60"
+
+DEFAULT_CHEAPEST_WINDOW_HOURS = 3.0
+
+CONF_ENTRY_ID = "entry_id"
+CONF_RATES = "rates"
+CONF_READINGS = "readings"
+CONF_INTERVAL = "interval"
+CONF_TIMESTAMP = "timestamp"
+CONF_ENERGY = "energy"
+CONF_DURATION = "duration"
+CONF_CONTIGUOUS = "contiguous"
+
+SERVICE_CALCULATE_COST = "calculate_cost"
+SERVICE_FIND_CHEAPEST_WINDOW = "find_cheapest_window"
+SERVICE_GET_PRICES = "get_prices"
+SERVICE_SET_RATES = "set_rates"
+
+SERVICE_MAX_RANGE = timedelta(days=366)
+DEFAULT_READING_INTERVAL = timedelta(hours=1)
+
+SIGNAL_OPTIONS_UPDATED = f"{DOMAIN}_options_updated_{{}}"
+
+DATA_TRIGGER_DISPATCHERS = f"{DOMAIN}_trigger_dispatchers"
 
 TRIGGER_RATE_ENTERED = "rate_entered"
 TRIGGER_RATE_EXITED = "rate_exited"
@@ -28,3 +63,21 @@ ATTR_ACTIVE_RULE = "active_rule_id"
 ATTR_ACTIVE_RATE_TYPE = "active_rate_type"
 ATTR_ACTIVE_RATE_TYPE_ID = "active_rate_type_id"
 ATTR_NEXT_TRANSITION = "next_transition"
+ATTR_CHEAPEST_WINDOW = "cheapest_window"
+ATTR_AVERAGE_RATE = "average_rate"
+
+NEXT_TRANSITION_LIMIT_HOURS = 24 * 31
+
+RATE_UPDATE_COOLDOWN = 1.0
+POLL_INTERVAL = timedelta(minutes=1)
+WATCHDOG_INTERVAL = timedelta(minutes=30)
+
+TIMING_WINDOW = 100
+STAGE_OPTIONS = "options"
+STAGE_VALIDATION = "validation"
+STAGE_COMPILE = "compile"
+STAGE_ACTIVE_RATE = "active_rate"
+STAGE_PRICES = "prices"
+STAGE_NEXT_TRANSITION = "next_transition"
+STAGE_CHEAPEST_WINDOW = "cheapest_window"
+STAGE_TOTAL = "total"
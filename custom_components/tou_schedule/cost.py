@@ -0,0 +1,292 @@
+"""Energy cost calculation for TOU schedule."""
+from __future__ import annotations
+
+from bisect import bisect_right
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from typing import Any, Iterable
+
+from .scheduler import CompiledSchedule
+
+
+@dataclass
+class RateTypeCost:
+    """Energy and cost attributed to one rate type."""
+
+    rate_type_name: str
+    energy: float = 0.0
+    cost: float = 0.0
+
+
+@dataclass
+class CostBreakdown:
+    """Total energy and cost of a consumption series."""
+
+    energy: float = 0.0
+    cost: float = 0.0
+    rate_types: dict[str, RateTypeCost] = field(default_factory=dict)
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the breakdown as a service response."""
+        return {
+            "energy": self.energy,
+            "cost": self.cost,
+            "rate_types": {
+                rate_type_id: {
+                    "name": item.rate_type_name,
+                    "energy": item.energy,
+                    "cost": item.cost,
+                }
+                for rate_type_id, item in self.rate_types.items()
+            },
+        }
+
+
+def intervals_from_readings(
+    readings: Iterable[tuple[datetime, float]],
+    interval: timedelta,
+) -> list[tuple[datetime, datetime, float]]:
+    """Return intervals for readings that each cover ``interval`` from their timestamp."""
+    return [(timestamp, timestamp + interval, energy) for timestamp, energy in readings]
+
+
+def intervals_from_meter(
+    values: Iterable[tuple[datetime, float]],
+) -> list[tuple[datetime, datetime, float]]:
+    """Return intervals from consecutive readings of a cumulative energy meter.
+
+    A decrease is treated as a meter reset, so the new value is counted as the
+    energy used since the previous reading.
+    """
+    intervals = []
+    previous: tuple[datetime, float] | None = None
+    for timestamp, total in values:
+        if previous is not None:
+            delta = total - previous[1]
+            intervals.append((previous[0], timestamp, delta if delta >= 0 else total))
+        previous = (timestamp, total)
+    return intervals
+
+
+def calculate_cost(
+    schedule: CompiledSchedule,
+    intervals: Iterable[tuple[datetime, datetime, float]],
+) -> CostBreakdown:
+    """Return the cost of consumption intervals under a schedule.
+
+    Intervals are (start, end, energy) with aware datetimes. Energy is spread
+    evenly over its interval and split at rate changes. The intervals are
+    sorted once and merged against the schedule segments in a single pass,
+    so the cost grows with the number of intervals plus rate changes.
+    """
+    ordered = sorted(
+        (start.timestamp(), end.timestamp(), energy, start)
+        for start, end, energy in intervals
+    )
+    breakdown = CostBreakdown()
+    if not ordered:
+        return breakdown
+
+    tzinfo = ordered[0][3].tzinfo
+    last = max(item[1] for item in ordered)
+    segment_ends: list[float] = []
+    segment_slots: list[int] = []
+    slot_rates: list[float] = []
+    slot_ids: list[str] = []
+    slots: dict[str, int] = {}
+    for _, segment_end, rate in schedule.iter_timestamp_segments(ordered[0][0], last, tzinfo):
+        slot = slots.get(rate.rate_type_id)
+        if slot is None:
+            slot = slots[rate.rate_type_id] = len(slot_ids)
+            slot_ids.append(rate.rate_type_id)
+            slot_rates.append(rate.rate)
+        segment_ends.append(segment_end)
+        segment_slots.append(slot)
+    if not segment_ends:
+        # All intervals are instantaneous at the same moment.
+        rate = schedule.rate_at(ordered[0][3])
+        slots[rate.rate_type_id] = 0
+        slot_ids.append(rate.rate_type_id)
+        slot_rates.append(rate.rate)
+        segment_ends.append(last)
+        segment_slots.append(0)
+
+    energy_by_slot = [0.0] * len(slot_ids)
+    cost_by_slot = [0.0] * len(slot_ids)
+    final = len(segment_ends) - 1
+    index = 0
+    for start, end, energy, _ in ordered:
+        while index < final and segment_ends[index] <= start:
+            index += 1
+        position = start
+        current = index
+        while current < final and segment_ends[current] < end:
+            share = energy * (segment_ends[current] - position) / (end - start)
+            slot = segment_slots[current]
+            energy_by_slot[slot] += share
+            cost_by_slot[slot] += share * slot_rates[slot]
+            position = segment_ends[current]
+            current += 1
+        share = energy * (end - position) / (end - start) if end > start else energy
+        slot = segment_slots[current]
+        energy_by_slot[slot] += share
+        cost_by_slot[slot] += share * slot_rates[slot]
+
+    rate_types = schedule.rate_types_by_id
+    for slot, rate_type_id in enumerate(slot_ids):
+        if not energy_by_slot[slot]:
+            continue
+        breakdown.rate_types[rate_type_id] = RateTypeCost(
+            rate_types[rate_type_id].get("name", rate_type_id),
+            energy_by_slot[slot],
+            cost_by_slot[slot],
+        )
+        breakdown.energy += energy_by_slot[slot]
+        breakdown.cost += cost_by_slot[slot]
+    return breakdown
+
+
+@dataclass(frozen=True)
+class CheapestWindow:
+    """Cheapest time to run a load of a given duration."""
+
+    start: datetime
+    end: datetime
+    average_rate: float
+    slots: tuple[tuple[datetime, datetime], ...]
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the window as a service response."""
+        return {
+            "start": self.start.isoformat(),
+            "end": self.end.isoformat(),
+            "average_rate": self.average_rate,
+            "slots": [
+                {"start": slot_start.isoformat(), "end": slot_end.isoformat()}
+                for slot_start, slot_end in self.slots
+            ],
+        }
+
+
+def find_cheapest_window(
+    schedule: CompiledSchedule,
+    start: datetime,
+    end: datetime,
+    duration: timedelta,
+    contiguous: bool = True,
+) -> CheapestWindow | None:
+    """Return the cheapest window of ``duration`` within [start, end].
+
+    A contiguous window is priced with prefix sums over the schedule
+    segments. Its cost is piecewise linear in the window start, so only
+    starts aligned with a segment start, or ends aligned with a segment end,
+    need to be compared. Otherwise the cheapest segments are taken in price
+    order until the duration is filled. Ties go to the earliest time. Returns
+    None when the duration does not fit.
+    """
+    length = duration.total_seconds()
+    first, last = start.timestamp(), end.timestamp()
+    if length <= 0 or last - first < length:
+        return None
+    tzinfo = start.tzinfo
+    starts: list[float] = []
+    ends: list[float] = []
+    rates: list[float] = []
+    for segment_start, segment_end, rate in schedule.iter_timestamp_segments(first, last, tzinfo):
+        starts.append(segment_start)
+        ends.append(segment_end)
+        rates.append(rate.rate)
+
+    if not contiguous:
+        chosen = []
+        remaining = length
+        for index in sorted(range(len(starts)), key=lambda index: (rates[index], starts[index])):
+            used = min(ends[index] - starts[index], remaining)
+            chosen.append((starts[index], starts[index] + used, rates[index]))
+            remaining -= used
+            if remaining <= 0:
+                break
+        chosen.sort()
+        slots: list[list[float]] = []
+        for slot_start, slot_end, _ in chosen:
+            if slots and slots[-1][1] == slot_start:
+                slots[-1][1] = slot_end
+            else:
+                slots.append([slot_start, slot_end])
+        cost = sum((slot_end - slot_start) * rate for slot_start, slot_end, rate in chosen)
+        return CheapestWindow(
+            datetime.fromtimestamp(slots[0][0], tzinfo),
+            datetime.fromtimestamp(slots[-1][1], tzinfo),
+            cost / length,
+            tuple(
+                (datetime.fromtimestamp(slot_start, tzinfo), datetime.fromtimestamp(slot_end, tzinfo))
+                for slot_start, slot_end in slots
+            ),
+        )
+
+    prefix = [0.0]
+    for segment_start, segment_end, rate in zip(starts, ends, rates):
+        prefix.append(prefix[-1] + (segment_end - segment_start) * rate)
+
+    def cost_until(position: float) -> float:
+        index = max(bisect_right(starts, position) - 1, 0)
+        return prefix[index] + (position - starts[index]) * rates[index]
+
+    latest = last - length
+    candidates = {first, latest}
+    candidates.update(value for value in starts if value <= latest)
+    candidates.update(value - length for value in ends if first <= value - length)
+    best_start = best_cost = None
+    for candidate in sorted(candidates):
+        cost = cost_until(candidate + length) - cost_until(candidate)
+        if best_cost is None or cost < best_cost - 1e-9 * length:
+            best_start, best_cost = candidate, cost
+    window_start = datetime.fromtimestamp(best_start, tzinfo)
+    window_end = datetime.fromtimestamp(best_start + length, tzinfo)
+    return CheapestWindow(
+        window_start, window_end, best_cost / length, ((window_start, window_end),)
+    )
+
+
+class WindowCache:
+    """Cache cheapest window results while they remain valid.
+
+    A result found for a range stays optimal for any later start up to the
+    window's own start, since the window is still available and the choice
+    only narrows. Entries are keyed on the schedule fingerprint, so a rate or
+    rule change misses the cache.
+    """
+
+    def __init__(self, maxsize: int = 8) -> None:
+        self._maxsize = maxsize
+        self._entries: OrderedDict[
+            tuple[str, datetime, timedelta, bool], tuple[datetime, CheapestWindow | None]
+        ] = OrderedDict()
+
+    def find_cheapest_window(
+        self,
+        schedule: CompiledSchedule,
+        start: datetime,
+        end: datetime,
+        duration: timedelta,
+        contiguous: bool = True,
+    ) -> CheapestWindow | None:
+        """Return the cheapest window, reusing a still valid result."""
+        key = (schedule.fingerprint, end, duration, contiguous)
+        cached = self._entries.get(key)
+        if cached is not None:
+            requested, window = cached
+            if requested <= start and (window is None or start <= window.start):
+                self._entries.move_to_end(key)
+                return window
+        window = find_cheapest_window(schedule, start, end, duration, contiguous)
+        self._entries[key] = (start, window)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self._maxsize:
+            self._entries.popitem(last=False)
+        return window
+
+    def clear(self) -> None:
+        """Drop all cached results."""
+        self._entries.clear()
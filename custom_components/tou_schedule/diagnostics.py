@@ -0,0 +1,34 @@
+"""Diagnostics support for TOU schedule."""
+from __future__ import annotations
+
+from typing import Any
+
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant
+
+from . import TouScheduleCoordinator
+from .const import ATTR_ACTIVE_RATE_TYPE_ID, ATTR_NEXT_TRANSITION, DOMAIN
+
+
+async def async_get_config_entry_diagnostics(
+    hass: HomeAssistant, entry: ConfigEntry
+) -> dict[str, Any]:
+    """Return diagnostics for a config entry."""
+    coordinator: TouScheduleCoordinator = hass.data[DOMAIN][entry.entry_id]
+    schedule = coordinator.schedule
+    data = coordinator.data or {}
+    return {
+        "options": dict(entry.options),
+        "refresh_mode": coordinator.refresh_mode,
+        "schedule": {
+            "fingerprint": schedule.fingerprint if schedule else None,
+            "lookup_table": schedule.table.memory_report()
+            if schedule and schedule.table
+            else None,
+        },
+        "state": {
+            ATTR_ACTIVE_RATE_TYPE_ID: data.get(ATTR_ACTIVE_RATE_TYPE_ID),
+            ATTR_NEXT_TRANSITION: data.get(ATTR_NEXT_TRANSITION),
+        },
+        "refresh_timings_ms": coordinator.timings.summary(),
+    }
@@ -1,14 +1,144 @@
 """Helper utilities for TOU schedule."""
 from __future__ import annotations
 
-from typing import Any
+from collections import deque
+from collections.abc import Iterator, Mapping
+from contextlib import contextmanager
+from dataclasses import dataclass
+from time import perf_counter
+from typing import TYPE_CHECKING, Any
+from weakref import WeakKeyDictionary
 
 from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers import device_registry as dr
 
-from .const import CONF_RATE_TYPES, CONF_RULES
+from .const import CONF_ID, CONF_RATE_TYPES, CONF_RULES, DOMAIN, TIMING_WINDOW
+
+if TYPE_CHECKING:
+    from . import TouScheduleCoordinator
+
+
+@dataclass(frozen=True)
+class OptionsSnapshot:
+    """Read-only view of rate types and rules with id lookups."""
+
+    rate_types: tuple[dict[str, Any], ...]
+    rules: tuple[dict[str, Any], ...]
+    rate_types_by_id: Mapping[str, dict[str, Any]]
+    rules_by_id: Mapping[str, dict[str, Any]]
+
+
+_SNAPSHOTS: WeakKeyDictionary[ConfigEntry, tuple[Mapping[str, Any], OptionsSnapshot]] = (
+    WeakKeyDictionary()
+)
+
+
+def get_options_snapshot(entry: ConfigEntry) -> OptionsSnapshot:
+    """Return a cached snapshot of the entry options.
+
+    Updating an entry replaces its options mapping, so the snapshot is rebuilt
+    whenever the mapping is no longer the one it was built from.
+    """
+    options = entry.options
+    cached = _SNAPSHOTS.get(entry)
+    if cached is not None and cached[0] is options:
+        return cached[1]
+    rate_types = tuple(options.get(CONF_RATE_TYPES, []))
+    rules = tuple(options.get(CONF_RULES, []))
+    snapshot = OptionsSnapshot(
+        rate_types=rate_types,
+        rules=rules,
+        rate_types_by_id={rate_type[CONF_ID]: rate_type for rate_type in rate_types},
+        rules_by_id={rule[CONF_ID]: rule for rule in rules},
+    )
+    _SNAPSHOTS[entry] = (options, snapshot)
+    return snapshot
 
 
 def get_options(entry: ConfigEntry) -> tuple[list[dict[str, Any]], list[dict[str, Any]]]:
     """Return rate types and rules from entry options."""
-    options = entry.options
-    return list(options.get(CONF_RATE_TYPES, [])), list(options.get(CONF_RULES, []))
+    snapshot = get_options_snapshot(entry)
+    return list(snapshot.rate_types), list(snapshot.rules)
+
+
+def find_coordinator(
+    hass: HomeAssistant, entry_id: str | None, device_id: str | None = None
+) -> TouScheduleCoordinator:
+    """Return the coordinator for an entry, or the only one if no id is given.
+
+    The entry may also be picked by one of its devices. Lookups go straight
+    to hass.data and the device registry. Raises ValueError when no single
+    loaded entry matches, for callers to report in their own terms.
+    """
+    coordinators = hass.data.get(DOMAIN, {})
+    if device_id is not None:
+        device = dr.async_get(hass).async_get(device_id)
+        if device is None:
+            raise ValueError(f"Unknown device: {device_id}")
+        entry_id = next(
+            (candidate for candidate in device.config_entries if candidate in coordinators),
+            None,
+        )
+        if entry_id is None:
+            raise ValueError(f"Device {device_id} has no loaded TOU schedule entry")
+    if entry_id is not None:
+        if entry_id not in coordinators:
+            raise ValueError(f"Unknown TOU schedule entry: {entry_id}")
+        return coordinators[entry_id]
+    if not coordinators:
+        raise ValueError("No TOU schedule configuration entries found")
+    if len(coordinators) > 1:
+        raise ValueError("Multiple TOU schedule entries found; specify entry_id")
+    return next(iter(coordinators.values()))
+
+
+class RefreshTimings:
+    """Rolling timings of refresh stages.
+
+    Keeps the last ``window`` samples per stage and reports them in
+    milliseconds as p50, p95 and max.
+    """
+
+    def __init__(self, window: int = TIMING_WINDOW) -> None:
+        self._window = window
+        self._samples: dict[str, deque[float]] = {}
+
+    def record(self, stage: str, seconds: float) -> None:
+        """Record the duration of one run of a stage."""
+        samples = self._samples.get(stage)
+        if samples is None:
+            samples = self._samples[stage] = deque(maxlen=self._window)
+        samples.append(seconds * 1000)
+
+    @contextmanager
+    def measure(self, stage: str) -> Iterator[None]:
+        """Record the time spent in the block."""
+        start = perf_counter()
+        try:
+            yield
+        finally:
+            self.record(stage, perf_counter() - start)
+
+    def stage(self, stage: str) -> dict[str, float] | None:
+        """Return the statistics of one stage, or None without samples."""
+        samples = self._samples.get(stage)
+        if not samples:
+            return None
+        ordered = sorted(samples)
+        return {
+            "count": len(ordered),
+            "last": samples[-1],
+            "p50": _percentile(ordered, 50),
+            "p95": _percentile(ordered, 95),
+            "max": ordered[-1],
+        }
+
+    def summary(self) -> dict[str, dict[str, float]]:
+        """Return the statistics of all stages."""
+        return {stage: self.stage(stage) for stage in self._samples if self._samples[stage]}
+
+
+def _percentile(ordered: list[float], percent: int) -> float:
+    """Return a nearest-rank percentile of sorted values."""
+    return ordered[max(0, -(-len(ordered) * percent // 100) - 1)]
@@ -5,11 +5,13 @@ from typing import Any
 
 from homeassistant.components.number import NumberEntity
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.core import HomeAssistant
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers import entity_registry as er
+from homeassistant.helpers.dispatcher import async_dispatcher_connect
 from homeassistant.helpers.update_coordinator import CoordinatorEntity
 
-from .const import CONF_ID, CONF_NAME, CONF_RATE, CONF_RATE_TYPES, DOMAIN
-from .helpers import get_options
+from .const import CONF_ID, CONF_NAME, CONF_RATE, DOMAIN, SIGNAL_OPTIONS_UPDATED
+from .helpers import get_options, get_options_snapshot
 from . import TouScheduleCoordinator
 
 
@@ -19,11 +21,27 @@ async def async_setup_entry(
     async_add_entities,
 ) -> None:
     coordinator: TouScheduleCoordinator = hass.data[DOMAIN][entry.entry_id]
-    rate_types, _ = get_options(entry)
-    entities = [
-        TouRateTypeNumber(coordinator, entry, rate_type) for rate_type in rate_types
-    ]
-    async_add_entities(entities)
+    known_rate_types: set[str] = set()
+
+    @callback
+    def _async_add_new_entities() -> None:
+        rate_types, _ = get_options(entry)
+        entities = [
+            TouRateTypeNumber(coordinator, entry, rate_type)
+            for rate_type in rate_types
+            if rate_type[CONF_ID] not in known_rate_types
+        ]
+        known_rate_types.clear()
+        known_rate_types.update(rate_type[CONF_ID] for rate_type in rate_types)
+        if entities:
+            async_add_entities(entities)
+
+    _async_add_new_entities()
+    entry.async_on_unload(
+        async_dispatcher_connect(
+            hass, SIGNAL_OPTIONS_UPDATED.format(entry.entry_id), _async_add_new_entities
+        )
+    )
 
 
 class TouRateTypeNumber(CoordinatorEntity[TouScheduleCoordinator], NumberEntity):
@@ -49,20 +67,35 @@ class TouRateTypeNumber(CoordinatorEntity[TouScheduleCoordinator], NumberEntity)
             "name": "TOU Schedule",
         }
 
+    async def async_added_to_hass(self) -> None:
+        await super().async_added_to_hass()
+        self.async_on_remove(
+            async_dispatcher_connect(
+                self.hass,
+                SIGNAL_OPTIONS_UPDATED.format(self._entry.entry_id),
+                self._handle_options_update,
+            )
+        )
+
+    @callback
+    def _handle_options_update(self) -> None:
+        rate_type = get_options_snapshot(self._entry).rate_types_by_id.get(self._rate_type_id)
+        if rate_type is None:
+            er.async_get(self.hass).async_remove(self.entity_id)
+            return
+        self._attr_name = rate_type[CONF_NAME]
+        self.async_write_ha_state()
+
     @property
     def native_value(self) -> float | None:
-        rate_types, _ = get_options(self._entry)
-        for rate_type in rate_types:
-            if rate_type[CONF_ID] == self._rate_type_id:
-                return float(rate_type[CONF_RATE])
-        return None
+        pending = self.coordinator.pending_rate(self._rate_type_id)
+        if pending is not None:
+            return pending
+        rate_type = get_options_snapshot(self._entry).rate_types_by_id.get(self._rate_type_id)
+        if rate_type is None:
+            return None
+        return float(rate_type[CONF_RATE])
 
     async def async_set_native_value(self, value: float) -> None:
-        options = dict(self._entry.options)
-        rate_types = list(options.get(CONF_RATE_TYPES, []))
-        for rate_type in rate_types:
-            if rate_type[CONF_ID] == self._rate_type_id:
-                rate_type[CONF_RATE] = float(value)
-                break
-        options[CONF_RATE_TYPES] = rate_types
-        self.hass.config_entries.async_update_entry(self._entry, options=options)
+        await self.coordinator.async_set_rates({self._rate_type_id: value})
+        self.async_write_ha_state()
@@ -1,17 +1,30 @@
 """Scheduling helpers for TOU schedule."""
 from __future__ import annotations
 
+from array import array
+from bisect import bisect_right
+from collections import OrderedDict
+from copy import deepcopy
 from dataclasses import dataclass
-from datetime import datetime, time, timedelta
-from typing import Any, Iterable
+from datetime import date, datetime, time, timedelta, timezone
+from functools import cached_property
+import hashlib
+import json
+from typing import Any, Iterable, Iterator, Sequence
 
 from homeassistant.util import dt as dt_util
 
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - numpy is optional
+    np = None
+
 from .const import (
     CONF_DEFAULT,
     CONF_END,
     CONF_ID,
     CONF_MONTHS,
+    CONF_NAME,
     CONF_PERIODS,
     CONF_RATE,
     CONF_RATE_TYPE,
@@ -30,6 +43,14 @@ class ActiveRate:
     rule_id: str | None
 
 
+MINUTES_PER_DAY = 24 * 60
+SECONDS_PER_DAY = MINUTES_PER_DAY * 60
+_EPOCH_DATE = date(1970, 1, 1)
+DAY_KEYS = 12 * 7
+TABLE_MEMORY_BUDGET = 512 * 1024
+COMPILED_CACHE_SIZE = 4
+
+
 def _parse_time(value: str) -> time:
     parts = value.split(":")
     hour = int(parts[0])
@@ -93,28 +114,576 @@ def rate_type_by_id(rate_types: list[dict[str, Any]], rate_type_id: str) -> dict
     raise ValueError(f"Unknown rate type: {rate_type_id}")
 
 
+def _active_rate(rate_type: dict[str, Any], rule_id: str | None) -> ActiveRate:
+    return ActiveRate(
+        rate_type_id=rate_type[CONF_ID],
+        rate_type_name=rate_type[CONF_NAME],
+        rate=float(rate_type[CONF_RATE]),
+        rule_id=rule_id,
+    )
+
+
+def schedule_fingerprint(
+    rate_types: list[dict[str, Any]],
+    rules: list[dict[str, Any]],
+) -> str:
+    """Return a stable hash of the rate types and rules."""
+    payload = json.dumps([rate_types, rules], sort_keys=True, default=str)
+    return hashlib.sha1(payload.encode()).hexdigest()
+
+
+def _parse_minutes(value: str) -> int:
+    parts = value.split(":")
+    return int(parts[0]) * 60 + int(parts[1])
+
+
+def _utc_offset(tzinfo, timestamp: int) -> int:
+    offset = datetime.fromtimestamp(timestamp, tzinfo).utcoffset()
+    return int(offset.total_seconds()) if offset else 0
+
+
+def _utc_offset_changes(tzinfo, first: int, last: int) -> tuple[list[int], list[int]]:
+    """Return change instants and the UTC offsets in effect from each one.
+
+    Offsets are probed once per day and each change is located to the
+    second by bisection, assuming at most one change per day.
+    """
+    changes = [first]
+    offsets = [_utc_offset(tzinfo, first)]
+    probe = first
+    while probe < last:
+        following = min(probe + SECONDS_PER_DAY, last)
+        offset = _utc_offset(tzinfo, following)
+        if offset != offsets[-1]:
+            low, high = probe, following
+            while high - low > 1:
+                middle = (low + high) // 2
+                if _utc_offset(tzinfo, middle) == offsets[-1]:
+                    low = middle
+                else:
+                    high = middle
+            changes.append(high)
+            offsets.append(offset)
+        probe = following
+    return changes, offsets
+
+
+def _timestamp(value: datetime) -> float:
+    """Return epoch seconds, reading naive datetimes as UTC."""
+    if value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc).timestamp()
+    return value.timestamp()
+
+
+def _from_timestamp(value: float, tzinfo) -> datetime:
+    """Return epoch seconds as a datetime in a zone, or naive UTC without one."""
+    if tzinfo is None:
+        return datetime.fromtimestamp(value, timezone.utc).replace(tzinfo=None)
+    return datetime.fromtimestamp(value, tzinfo)
+
+
+def local_datetime(wall: datetime, tzinfo) -> datetime:
+    """Return the instant a naive wall clock time occurs in a zone.
+
+    Ambiguous times resolve to their first occurrence. Times skipped by a
+    forward switch resolve to the moment the clock jumps past them.
+    """
+    if tzinfo is None:
+        return wall
+    first = wall.replace(tzinfo=tzinfo, fold=0)
+    instant = first.astimezone(timezone.utc).astimezone(tzinfo)
+    if instant.replace(tzinfo=None) == wall:
+        return instant
+    changes, _ = _utc_offset_changes(
+        tzinfo, int(wall.replace(tzinfo=tzinfo, fold=1).timestamp()), int(first.timestamp())
+    )
+    return datetime.fromtimestamp(changes[-1], tzinfo)
+
+
+def local_day_start(day: date, tzinfo) -> datetime:
+    """Return the first instant of a local day."""
+    return local_datetime(datetime.combine(day, time()), tzinfo)
+
+
+@dataclass(frozen=True)
+class _CompiledRule:
+    """Rule with months, weekdays and periods pre-parsed."""
+
+    months: frozenset[int]
+    weekdays: frozenset[int]
+    periods: tuple[tuple[int, int], ...]
+    rate: ActiveRate
+
+    def matches_day(self, month: int, weekday: int) -> bool:
+        if self.months and month not in self.months:
+            return False
+        return not self.weekdays or weekday in self.weekdays
+
+
+@dataclass(frozen=True)
+class DayProfile:
+    """Rate segments covering one local day, sorted by start minute."""
+
+    starts: tuple[int, ...]
+    rates: tuple[ActiveRate, ...]
+
+    def rate_at(self, minute: int) -> ActiveRate:
+        """Return the rate active at a minute of the day."""
+        return self.rates[bisect_right(self.starts, minute) - 1]
+
+
+class ScheduleTable:
+    """Month x weekday x minute lookup table of rate indices.
+
+    Each distinct day profile is expanded to one row of 1440 slots holding an
+    index into ``rates``; ``day_offsets`` maps each of the 84 month/weekday
+    combinations to the start of its row. Rows are shared between days, so
+    typical tariffs need only a few rows instead of the full 12 * 7.
+    """
+
+    def __init__(
+        self,
+        rates: tuple[ActiveRate, ...],
+        slots: array,
+        day_offsets: array,
+    ) -> None:
+        self.rates = rates
+        self.slots = slots
+        self.day_offsets = day_offsets
+
+    @classmethod
+    def build(
+        cls,
+        schedule: CompiledSchedule,
+        memory_budget: int = TABLE_MEMORY_BUDGET,
+    ) -> ScheduleTable | None:
+        """Build the table, or return None if it cannot be represented."""
+        rate_index: dict[ActiveRate, int] = {}
+        row_offsets: dict[int, int] = {}
+        day_offsets = array("I")
+        rows: list[DayProfile] = []
+        for month in range(1, 13):
+            for weekday in range(7):
+                profile = schedule.day_profile(month, weekday)
+                offset = row_offsets.get(id(profile))
+                if offset is None:
+                    offset = row_offsets[id(profile)] = len(rows) * MINUTES_PER_DAY
+                    rows.append(profile)
+                    for rate in profile.rates:
+                        rate_index.setdefault(rate, len(rate_index))
+                day_offsets.append(offset)
+
+        if len(rate_index) <= 0xFF:
+            typecode = "B"
+        elif len(rate_index) <= 0xFFFF:
+            typecode = "H"
+        else:
+            return None
+        slots = array(typecode)
+        if len(rows) * MINUTES_PER_DAY * slots.itemsize > memory_budget:
+            return None
+        for profile in rows:
+            ends = profile.starts[1:] + (MINUTES_PER_DAY,)
+            for start, end, rate in zip(profile.starts, ends, profile.rates):
+                slots.extend([rate_index[rate]] * (end - start))
+        return cls(tuple(rate_index), slots, day_offsets)
+
+    def rate_at(self, now: datetime) -> ActiveRate:
+        """Return the active rate at a datetime."""
+        offset = self.day_offsets[(now.month - 1) * 7 + now.weekday()]
+        return self.rates[self.slots[offset + now.hour * 60 + now.minute]]
+
+    def memory_report(self) -> dict[str, int]:
+        """Return the size of the table and of an undeduplicated equivalent."""
+        slot_bytes = len(self.slots) * self.slots.itemsize
+        offset_bytes = len(self.day_offsets) * self.day_offsets.itemsize
+        return {
+            "rows": len(self.slots) // MINUTES_PER_DAY,
+            "rates": len(self.rates),
+            "slot_bytes": slot_bytes,
+            "offset_bytes": offset_bytes,
+            "total_bytes": slot_bytes + offset_bytes,
+            "dense_bytes": DAY_KEYS * MINUTES_PER_DAY * self.slots.itemsize,
+        }
+
+
+class CompiledSchedule:
+    """Rules and rate types compiled into per-day rate segments.
+
+    Rules can only vary by month, weekday and minute of day, so every local day
+    maps to one of at most 12 * 7 day profiles. Profiles are built lazily on
+    first use and shared between days with the same set of matching rules.
+
+    With ``lookup_table`` set, all profiles are expanded up front into a
+    ScheduleTable and ``rate_at`` becomes a single index lookup. If the table
+    cannot be built, lookups fall back to bisecting the day profiles.
+    """
+
+    def __init__(
+        self,
+        rate_types: list[dict[str, Any]],
+        rules: list[dict[str, Any]],
+        lookup_table: bool = False,
+    ) -> None:
+        self.rate_types_by_id: dict[str, dict[str, Any]] = {
+            rate_type[CONF_ID]: rate_type for rate_type in rate_types
+        }
+        self.rate_type_ids = tuple(self.rate_types_by_id)
+        self._default_rate_type = next(
+            (rate_type for rate_type in rate_types if rate_type.get(CONF_DEFAULT)), None
+        )
+        self._rules = tuple(self._compile_rule(rule) for rule in rules)
+        self._source = (rate_types, rules)
+        self._day_profiles: dict[tuple[int, int], DayProfile] = {}
+        self._profiles_by_rules: dict[tuple[int, ...], DayProfile] = {}
+        self.table: ScheduleTable | None = ScheduleTable.build(self) if lookup_table else None
+
+    @cached_property
+    def fingerprint(self) -> str:
+        """Return the fingerprint of the rate types and rules, computed on first use."""
+        return schedule_fingerprint(*self._source)
+
+    def _compile_rule(self, rule: dict[str, Any]) -> _CompiledRule:
+        rate_type_id = rule[CONF_RATE_TYPE]
+        if rate_type_id not in self.rate_types_by_id:
+            raise ValueError(f"Unknown rate type: {rate_type_id}")
+        periods = []
+        for period in rule.get(CONF_PERIODS, []):
+            start = _parse_minutes(period[CONF_START])
+            end = _parse_minutes(period[CONF_END])
+            if start < end:
+                periods.append((start, end))
+        return _CompiledRule(
+            months=frozenset(rule.get(CONF_MONTHS, [])),
+            weekdays=frozenset(rule.get(CONF_WEEKDAYS, [])),
+            periods=tuple(sorted(periods)),
+            rate=_active_rate(self.rate_types_by_id[rate_type_id], rule[CONF_ID]),
+        )
+
+    @property
+    def default_rate(self) -> ActiveRate:
+        """Return the rate used when no rule applies."""
+        if self._default_rate_type is None:
+            raise ValueError("No default rate type configured")
+        return _active_rate(self._default_rate_type, None)
+
+    def day_profile(self, month: int, weekday: int) -> DayProfile:
+        """Return the rate segments for a month (1-12) and weekday (0-6)."""
+        key = (month, weekday)
+        profile = self._day_profiles.get(key)
+        if profile is None:
+            matching = tuple(
+                index
+                for index, rule in enumerate(self._rules)
+                if rule.matches_day(month, weekday)
+            )
+            profile = self._profiles_by_rules.get(matching)
+            if profile is None:
+                profile = self._build_profile(matching)
+                self._profiles_by_rules[matching] = profile
+            self._day_profiles[key] = profile
+        return profile
+
+    def _build_profile(self, matching: tuple[int, ...]) -> DayProfile:
+        # Paint minutes in reverse rule order so the first matching rule wins,
+        # mirroring the first-match semantics of find_active_rule.
+        owners = [-1] * MINUTES_PER_DAY
+        for index in reversed(matching):
+            for start, end in self._rules[index].periods:
+                owners[start:end] = [index] * (end - start)
+        starts: list[int] = []
+        rates: list[ActiveRate] = []
+        previous = None
+        for minute, owner in enumerate(owners):
+            if owner == previous:
+                continue
+            previous = owner
+            starts.append(minute)
+            rates.append(self.default_rate if owner < 0 else self._rules[owner].rate)
+        return DayProfile(tuple(starts), tuple(rates))
+
+    def rate_at(self, now: datetime) -> ActiveRate:
+        """Return the active rate at a datetime."""
+        if self.table is not None:
+            return self.table.rate_at(now)
+        profile = self.day_profile(now.month, now.weekday())
+        return profile.rate_at(now.hour * 60 + now.minute)
+
+    def prices_for_day(
+        self,
+        start: datetime,
+        tzinfo,
+        resolution: int | None = 60,
+    ) -> list[dict[str, Any]]:
+        """Build prices for a given local day.
+
+        The day runs from one local midnight to the next in absolute time, so
+        DST switch days have 23 or 25 hourly entries. With a resolution in
+        minutes, one entry is emitted per slot with the price at the start of
+        the slot. With ``None``, one entry is emitted per price change,
+        starting at midnight.
+        """
+        day = start.astimezone(tzinfo).date() if start.tzinfo and tzinfo else start.date()
+        first = _timestamp(local_day_start(day, tzinfo))
+        last = _timestamp(local_day_start(day + timedelta(days=1), tzinfo))
+        points: list[tuple[float, float]] = []
+        segments = self.iter_timestamp_segments(first, last, tzinfo)
+        if resolution is None:
+            for segment_start, _, rate in segments:
+                if not points or points[-1][1] != rate.rate:
+                    points.append((segment_start, rate.rate))
+        else:
+            _, segment_end, rate = next(segments)
+            slot = first
+            while slot < last:
+                while slot >= segment_end:
+                    _, segment_end, rate = next(segments)
+                points.append((slot, rate.rate))
+                slot += resolution * 60
+        return [
+            {"time": _from_timestamp(slot, tzinfo).isoformat(), "price": price}
+            for slot, price in points
+        ]
+
+    def iter_timestamp_segments(
+        self,
+        first: float,
+        last: float,
+        tzinfo,
+    ) -> Iterator[tuple[float, float, ActiveRate]]:
+        """Yield (start, end, rate) segments covering [first, last) in epoch seconds.
+
+        The range is split into spans with a constant UTC offset and each
+        span is walked through the day profiles of its wall clock days. Rule
+        boundaries skipped by a forward switch never occur, and boundaries in
+        a repeated hour occur twice, matching ``rate_at`` on local times.
+        Adjacent segments with the same rate are merged.
+        """
+        current: ActiveRate | None = None
+        segment_start = first
+        changes, offsets = _utc_offset_changes(
+            tzinfo or timezone.utc, int(first // 1), int(-(-last // 1))
+        )
+        for span_start, span_end, offset in zip(changes, changes[1:] + [last], offsets):
+            span_start = max(span_start, first)
+            day = int((span_start + offset) // SECONDS_PER_DAY)
+            day_base = day * SECONDS_PER_DAY - offset
+            while day_base < span_end:
+                day_date = _EPOCH_DATE + timedelta(days=day)
+                profile = self.day_profile(day_date.month, day_date.weekday())
+                index = max(bisect_right(profile.starts, (span_start - day_base) // 60) - 1, 0)
+                for minute, rate in zip(profile.starts[index:], profile.rates[index:]):
+                    boundary = max(day_base + minute * 60, span_start)
+                    if boundary >= span_end:
+                        break
+                    if rate == current:
+                        continue
+                    if current is not None:
+                        yield segment_start, boundary, current
+                        segment_start = boundary
+                    current = rate
+                day += 1
+                day_base += SECONDS_PER_DAY
+        if current is not None:
+            yield segment_start, last, current
+
+    def iter_segments(
+        self,
+        start: datetime,
+        end: datetime,
+    ) -> Iterator[tuple[datetime, datetime, ActiveRate]]:
+        """Yield (start, end, rate) segments covering [start, end).
+
+        Rules follow the wall clock of ``start``'s time zone. Adjacent
+        segments with the same rate are merged, including across midnight, so
+        the output has one entry per rate change.
+        """
+        tzinfo = start.tzinfo
+        for segment_start, segment_end, rate in self.iter_timestamp_segments(
+            _timestamp(start), _timestamp(end), tzinfo
+        ):
+            yield _from_timestamp(segment_start, tzinfo), _from_timestamp(segment_end, tzinfo), rate
+
+    def next_transition(self, now: datetime, limit_hours: int = 48) -> datetime | None:
+        """Return the next transition datetime if any within a window.
+
+        Walks the day profiles segment by segment instead of probing every
+        minute. The window is measured in elapsed time from the start of the
+        current minute, so it is the same length across DST switches.
+        """
+        first = _timestamp(now)
+        limit = first - first % 60 + limit_hours * 3600
+        for _, segment_end, _ in self.iter_timestamp_segments(first, limit + 1, now.tzinfo):
+            return _from_timestamp(segment_end, now.tzinfo) if segment_end <= limit else None
+        return None
+
+
+class DayPriceCache:
+    """Small LRU cache of day price arrays.
+
+    Entries are keyed by the UTC instant the local day starts, time zone,
+    schedule fingerprint and resolution, so refreshes within the same day
+    return the very same list objects, including across a DST switch.
+    """
+
+    def __init__(self, maxsize: int = 4) -> None:
+        self._maxsize = maxsize
+        self._entries: OrderedDict[
+            tuple[float, str, str, int | None], list[dict[str, Any]]
+        ] = OrderedDict()
+
+    def prices_for_day(
+        self,
+        schedule: CompiledSchedule,
+        start: datetime,
+        tzinfo,
+        resolution: int | None = 60,
+    ) -> list[dict[str, Any]]:
+        """Return cached prices for the day, building them on a miss."""
+        day = start.astimezone(tzinfo).date() if start.tzinfo and tzinfo else start.date()
+        key = (
+            _timestamp(local_day_start(day, tzinfo)),
+            str(tzinfo),
+            schedule.fingerprint,
+            resolution,
+        )
+        prices = self._entries.get(key)
+        if prices is not None:
+            self._entries.move_to_end(key)
+            return prices
+        prices = schedule.prices_for_day(start, tzinfo, resolution)
+        self._entries[key] = prices
+        if len(self._entries) > self._maxsize:
+            self._entries.popitem(last=False)
+        return prices
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+
+def _civil_month(days):
+    """Return the month (1-12) for days since 1970-01-01.
+
+    Works on ints and numpy integer arrays alike (Howard Hinnant's
+    civil_from_days algorithm).
+    """
+    z = days + 719468
+    doe = z - (z // 146097) * 146097
+    yoe = (doe - doe // 1460 + doe // 36524 - doe // 146096) // 365
+    doy = doe - (365 * yoe + yoe // 4 - yoe // 100)
+    mp = (5 * doy + 2) // 153
+    return (mp + 2) % 12 + 1
+
+
+def rates_for_timestamps(
+    schedule: CompiledSchedule,
+    timestamps: Sequence[float] | Any,
+    tzinfo=None,
+) -> tuple[Any, Any]:
+    """Return rates and rate type indices for many timestamps at once.
+
+    Timestamps are epoch seconds, or a numpy datetime64 array when numpy is
+    available. Each timestamp is decomposed into local month, weekday and
+    minute of day and resolved through the schedule lookup table, without
+    creating a datetime per element. Indices refer to
+    ``schedule.rate_type_ids``.
+
+    numpy input returns numpy arrays; any other sequence returns
+    ``array('d')`` rates and ``array('H')`` indices.
+    """
+    tzinfo = tzinfo or timezone.utc
+    table = schedule.table or ScheduleTable.build(
+        schedule, memory_budget=DAY_KEYS * MINUTES_PER_DAY * 2
+    )
+    if table is None:
+        raise ValueError("Schedule has too many distinct rates for a lookup table")
+    positions = {
+        rate_type_id: index
+        for index, rate_type_id in enumerate(schedule.rate_type_ids)
+    }
+    rate_values = [rate.rate for rate in table.rates]
+    rate_type_indices = [positions[rate.rate_type_id] for rate in table.rates]
+
+    if np is not None and isinstance(timestamps, np.ndarray):
+        if np.issubdtype(timestamps.dtype, np.datetime64):
+            seconds = timestamps.astype("datetime64[s]").astype(np.int64)
+        else:
+            seconds = np.floor(timestamps).astype(np.int64)
+        if not len(seconds):
+            return np.empty(0, dtype=np.float64), np.empty(0, dtype=np.int64)
+        changes, offsets = _utc_offset_changes(tzinfo, int(seconds.min()), int(seconds.max()))
+        local = seconds + np.asarray(offsets, dtype=np.int64)[
+            np.searchsorted(np.asarray(changes, dtype=np.int64), seconds, side="right") - 1
+        ]
+        days = local // SECONDS_PER_DAY
+        minutes = (local - days * SECONDS_PER_DAY) // 60
+        day_keys = (_civil_month(days) - 1) * 7 + (days + 3) % 7
+        slots = np.frombuffer(table.slots, dtype=table.slots.typecode)
+        offsets_by_day = np.frombuffer(table.day_offsets, dtype=np.uint32).astype(np.int64)
+        rate_indices = slots[offsets_by_day[day_keys] + minutes]
+        return (
+            np.asarray(rate_values, dtype=np.float64)[rate_indices],
+            np.asarray(rate_type_indices, dtype=np.int64)[rate_indices],
+        )
+
+    seconds_list = [int(value // 1) for value in timestamps]
+    rates = array("d")
+    indices = array("H")
+    if not seconds_list:
+        return rates, indices
+    changes, offsets = _utc_offset_changes(tzinfo, min(seconds_list), max(seconds_list))
+    slots = table.slots
+    day_offsets = table.day_offsets
+    for value in seconds_list:
+        local = value + offsets[bisect_right(changes, value) - 1]
+        days, remainder = divmod(local, SECONDS_PER_DAY)
+        rate_index = slots[
+            day_offsets[(_civil_month(days) - 1) * 7 + (days + 3) % 7] + remainder // 60
+        ]
+        rates.append(rate_values[rate_index])
+        indices.append(rate_type_indices[rate_index])
+    return rates, indices
+
+
+_COMPILED_SCHEDULES: list[tuple[list[dict[str, Any]], list[dict[str, Any]], CompiledSchedule]] = []
+
+
+def _compiled_schedule(
+    rate_types: list[dict[str, Any]],
+    rules: list[dict[str, Any]],
+) -> CompiledSchedule:
+    """Return a compiled schedule for the inputs, reusing a recent one.
+
+    Cached inputs are kept as copies and matched by equality, so callers that
+    mutate their lists in place never get a stale schedule. A lookup costs
+    about one scan of the rules, far less than compiling them.
+    """
+    for index, (cached_rate_types, cached_rules, schedule) in enumerate(_COMPILED_SCHEDULES):
+        if cached_rules == rules and cached_rate_types == rate_types:
+            if index:
+                _COMPILED_SCHEDULES.insert(0, _COMPILED_SCHEDULES.pop(index))
+            return schedule
+    schedule = CompiledSchedule(rate_types, rules)
+    _COMPILED_SCHEDULES.insert(0, (deepcopy(rate_types), deepcopy(rules), schedule))
+    del _COMPILED_SCHEDULES[COMPILED_CACHE_SIZE:]
+    return schedule
+
+
 def get_active_rate(
     rules: list[dict[str, Any]],
     rate_types: list[dict[str, Any]],
     now: datetime,
 ) -> ActiveRate:
-    """Return the active rate at a datetime."""
+    """Return the active rate at a datetime.
+
+    A single lookup scans the rules directly; comparing the inputs against a
+    cached CompiledSchedule would cost as much as the scan itself.
+    """
     active_rule = find_active_rule(rules, now)
     if active_rule is None:
-        default = default_rate_type(rate_types)
-        return ActiveRate(
-            rate_type_id=default[CONF_ID],
-            rate_type_name=default["name"],
-            rate=float(default[CONF_RATE]),
-            rule_id=None,
-        )
-
-    rate_type = rate_type_by_id(rate_types, active_rule[CONF_RATE_TYPE])
-    return ActiveRate(
-        rate_type_id=rate_type[CONF_ID],
-        rate_type_name=rate_type["name"],
-        rate=float(rate_type[CONF_RATE]),
-        rule_id=active_rule[CONF_ID],
+        return _active_rate(default_rate_type(rate_types), None)
+    return _active_rate(
+        rate_type_by_id(rate_types, active_rule[CONF_RATE_TYPE]), active_rule[CONF_ID]
     )
 
 
@@ -123,20 +692,10 @@ def build_prices_for_day(
     rules: list[dict[str, Any]],
     rate_types: list[dict[str, Any]],
     tzinfo,
+    resolution: int | None = 60,
 ) -> list[dict[str, Any]]:
-    """Build hourly prices for a given local day."""
-    prices: list[dict[str, Any]] = []
-    current = start.replace(minute=0, second=0, microsecond=0, tzinfo=tzinfo)
-    for _ in range(24):
-        rate = get_active_rate(rules, rate_types, current)
-        prices.append(
-            {
-                "time": current.isoformat(),
-                "price": rate.rate,
-            }
-        )
-        current += timedelta(hours=1)
-    return prices
+    """Build prices for a given local day."""
+    return _compiled_schedule(rate_types, rules).prices_for_day(start, tzinfo, resolution)
 
 
 def next_transition(
@@ -146,16 +705,10 @@ def next_transition(
     limit_hours: int = 48,
 ) -> datetime | None:
     """Return the next transition datetime if any within a window."""
-    baseline = get_active_rate(rules, rate_types, now)
-    current = now.replace(second=0, microsecond=0)
-    for _ in range(limit_hours * 60):
-        current += timedelta(minutes=1)
-        if get_active_rate(rules, rate_types, current) != baseline:
-            return current
-    return None
+    return _compiled_schedule(rate_types, rules).next_transition(now, limit_hours)
 
 
 def local_midnight(now: datetime) -> datetime:
     """Return local midnight for the datetime."""
     local = dt_util.as_local(now)
-    return local.replace(hour=0, minute=0, second=0, microsecond=0)
+    return local_day_start(local.date(), local.tzinfo)
@@ -1,10 +1,16 @@
 """Sensors for TOU schedule."""
 from __future__ import annotations
 
+from datetime import datetime
 from typing import Any
 
-from homeassistant.components.sensor import SensorEntity
+from homeassistant.components.sensor import (
+    SensorDeviceClass,
+    SensorEntity,
+    SensorStateClass,
+)
 from homeassistant.config_entries import ConfigEntry
+from homeassistant.const import EntityCategory, UnitOfTime
 from homeassistant.core import HomeAssistant
 from homeassistant.helpers.entity import DeviceInfo
 from homeassistant.helpers.update_coordinator import CoordinatorEntity
@@ -14,11 +20,15 @@ from .const import (
     ATTR_ACTIVE_RATE_TYPE,
     ATTR_ACTIVE_RATE_TYPE_ID,
     ATTR_ACTIVE_RULE,
+    ATTR_AVERAGE_RATE,
+    ATTR_CHEAPEST_WINDOW,
     ATTR_NEXT_TRANSITION,
     ATTR_PRICES_TODAY,
     ATTR_PRICES_TOMORROW,
+    CONF_END,
     CONF_NAME,
     DOMAIN,
+    STAGE_TOTAL,
 )
 
 
@@ -33,6 +43,8 @@ async def async_setup_entry(
         TouActiveRuleSensor(coordinator, entry),
         TouActiveRateTypeSensor(coordinator, entry),
         TouNextTransitionSensor(coordinator, entry),
+        TouCheapestWindowSensor(coordinator, entry),
+        TouRefreshTimeSensor(coordinator, entry),
     ]
     async_add_entities(entities)
 
@@ -40,8 +52,11 @@ async def async_setup_entry(
 class TouBaseSensor(CoordinatorEntity[TouScheduleCoordinator], SensorEntity):
     """Base sensor for TOU schedule."""
 
+    _unique_id_suffix: str
+
     def __init__(self, coordinator: TouScheduleCoordinator, entry: ConfigEntry) -> None:
         super().__init__(coordinator)
+        self._attr_unique_id = f"{entry.entry_id}_{self._unique_id_suffix}"
         self._attr_device_info = DeviceInfo(
             identifiers={(DOMAIN, entry.entry_id)},
             name="TOU Schedule",
@@ -52,7 +67,7 @@ class TouEVPriceSensor(TouBaseSensor):
     """EV Smart Charging price sensor."""
 
     _attr_name = "TOU EV Price"
-    _attr_unique_id = "tou_ev_price"
+    _unique_id_suffix = "ev_price"
     _attr_native_unit_of_measurement = "USD/kWh"
 
     @property
@@ -69,7 +84,7 @@ class TouEVPriceSensor(TouBaseSensor):
 
 class TouActiveRuleSensor(TouBaseSensor):
     _attr_name = "TOU Active Rule"
-    _attr_unique_id = "tou_active_rule"
+    _unique_id_suffix = "active_rule"
 
     @property
     def native_value(self) -> str | None:
@@ -78,7 +93,7 @@ class TouActiveRuleSensor(TouBaseSensor):
 
 class TouActiveRateTypeSensor(TouBaseSensor):
     _attr_name = "TOU Active Rate Type"
-    _attr_unique_id = "tou_active_rate_type"
+    _unique_id_suffix = "active_rate_type"
 
     @property
     def native_value(self) -> str:
@@ -93,8 +108,51 @@ class TouActiveRateTypeSensor(TouBaseSensor):
 
 class TouNextTransitionSensor(TouBaseSensor):
     _attr_name = "TOU Next Transition"
-    _attr_unique_id = "tou_next_transition"
+    _unique_id_suffix = "next_transition"
 
     @property
     def native_value(self) -> str | None:
         return self.coordinator.data[ATTR_NEXT_TRANSITION]
+
+
+class TouCheapestWindowSensor(TouBaseSensor):
+    """Start of the cheapest window before the end of tomorrow."""
+
+    _attr_name = "TOU Cheapest Window"
+    _unique_id_suffix = "cheapest_window"
+    _attr_device_class = SensorDeviceClass.TIMESTAMP
+
+    @property
+    def native_value(self) -> datetime | None:
+        window = self.coordinator.data[ATTR_CHEAPEST_WINDOW]
+        return window.start if window else None
+
+    @property
+    def extra_state_attributes(self) -> dict[str, Any]:
+        window = self.coordinator.data[ATTR_CHEAPEST_WINDOW]
+        return {
+            CONF_END: window.end.isoformat() if window else None,
+            ATTR_AVERAGE_RATE: window.average_rate if window else None,
+        }
+
+
+class TouRefreshTimeSensor(TouBaseSensor):
+    """95th percentile of recent coordinator refresh times."""
+
+    _attr_name = "TOU Refresh Time"
+    _unique_id_suffix = "refresh_time"
+    _attr_device_class = SensorDeviceClass.DURATION
+    _attr_state_class = SensorStateClass.MEASUREMENT
+    _attr_native_unit_of_measurement = UnitOfTime.MILLISECONDS
+    _attr_suggested_display_precision = 2
+    _attr_entity_category = EntityCategory.DIAGNOSTIC
+    _attr_entity_registry_enabled_default = False
+
+    @property
+    def native_value(self) -> float | None:
+        total = self.coordinator.timings.stage(STAGE_TOTAL)
+        return total["p95"] if total else None
+
+    @property
+    def extra_state_attributes(self) -> dict[str, Any]:
+        return self.coordinator.timings.summary()
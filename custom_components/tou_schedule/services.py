@@ -0,0 +1,265 @@
+"""Services for TOU schedule."""
+from __future__ import annotations
+
+from datetime import datetime, tzinfo as dt_tzinfo
+from functools import partial
+from typing import TYPE_CHECKING, Any
+
+import voluptuous as vol
+
+from homeassistant.core import (
+    HomeAssistant,
+    ServiceCall,
+    ServiceResponse,
+    SupportsResponse,
+    callback,
+)
+from homeassistant.const import CONF_ENTITY_ID, STATE_UNAVAILABLE, STATE_UNKNOWN
+from homeassistant.exceptions import ServiceValidationError
+from homeassistant.helpers import config_validation as cv
+from homeassistant.util import dt as dt_util
+
+from .const import (
+    CONF_CONTIGUOUS,
+    CONF_DURATION,
+    CONF_END,
+    CONF_ENERGY,
+    CONF_ENTRY_ID,
+    CONF_INTERVAL,
+    CONF_RATES,
+    CONF_READINGS,
+    CONF_START,
+    CONF_TIMESTAMP,
+    DEFAULT_READING_INTERVAL,
+    DOMAIN,
+    SERVICE_CALCULATE_COST,
+    SERVICE_FIND_CHEAPEST_WINDOW,
+    SERVICE_GET_PRICES,
+    SERVICE_MAX_RANGE,
+    SERVICE_SET_RATES,
+)
+from .cost import calculate_cost, intervals_from_meter, intervals_from_readings
+from .helpers import find_coordinator
+
+if TYPE_CHECKING:
+    from . import TouScheduleCoordinator
+
+SET_RATES_SCHEMA = vol.Schema(
+    {
+        vol.Optional(CONF_ENTRY_ID): cv.string,
+        vol.Required(CONF_RATES): {cv.string: vol.All(vol.Coerce(float), vol.Range(min=0))},
+    }
+)
+
+GET_PRICES_SCHEMA = vol.Schema(
+    {
+        vol.Optional(CONF_ENTRY_ID): cv.string,
+        vol.Optional(CONF_START): cv.datetime,
+        vol.Required(CONF_END): cv.datetime,
+    }
+)
+
+FIND_CHEAPEST_WINDOW_SCHEMA = vol.Schema(
+    {
+        vol.Optional(CONF_ENTRY_ID): cv.string,
+        vol.Required(CONF_DURATION): vol.All(cv.time_period, cv.positive_timedelta),
+        vol.Optional(CONF_START): cv.datetime,
+        vol.Required(CONF_END): cv.datetime,
+        vol.Optional(CONF_CONTIGUOUS, default=True): cv.boolean,
+    }
+)
+
+# Readings are validated in the handler: a year of 5 minute readings is too
+# many items to push through a per-item voluptuous schema.
+CALCULATE_COST_SCHEMA = vol.All(
+    vol.Schema(
+        {
+            vol.Optional(CONF_ENTRY_ID): cv.string,
+            vol.Exclusive(CONF_READINGS, "source"): list,
+            vol.Exclusive(CONF_ENTITY_ID, "source"): cv.entity_id,
+            vol.Optional(CONF_INTERVAL, default=DEFAULT_READING_INTERVAL): vol.All(
+                cv.time_period, cv.positive_timedelta
+            ),
+            vol.Optional(CONF_START): cv.datetime,
+            vol.Optional(CONF_END): cv.datetime,
+        }
+    ),
+    cv.has_at_least_one_key(CONF_READINGS, CONF_ENTITY_ID),
+)
+
+
+def get_coordinator(hass: HomeAssistant, entry_id: str | None) -> TouScheduleCoordinator:
+    """Return the coordinator a service call targets."""
+    try:
+        return find_coordinator(hass, entry_id)
+    except ValueError as err:
+        raise ServiceValidationError(str(err)) from err
+
+
+def _as_local(value: datetime, tzinfo: dt_tzinfo) -> datetime:
+    """Return a datetime in the given zone, treating naive values as local."""
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=tzinfo)
+    return value.astimezone(tzinfo)
+
+
+def _local_range(
+    hass: HomeAssistant,
+    data: dict[str, Any],
+    start: datetime | None = None,
+    end: datetime | None = None,
+) -> tuple[datetime, datetime]:
+    """Return the requested range as local aware datetimes.
+
+    ``start`` and ``end`` are the defaults for values missing from ``data``;
+    start falls back to now.
+    """
+    tzinfo = dt_util.get_time_zone(hass.config.time_zone)
+    start = _as_local(data.get(CONF_START) or start or dt_util.now(), tzinfo)
+    end = data.get(CONF_END) or end
+    if end is None:
+        raise ServiceValidationError("end is required")
+    end = _as_local(end, tzinfo)
+    if end <= start:
+        raise ServiceValidationError("end must be after start")
+    if end - start > SERVICE_MAX_RANGE:
+        raise ServiceValidationError(f"Range cannot exceed {SERVICE_MAX_RANGE.days} days")
+    return start, end
+
+
+def _parse_readings(
+    readings: list[Any], tzinfo: dt_tzinfo
+) -> list[tuple[datetime, float]]:
+    """Return (timestamp, energy) pairs from service readings.
+
+    Each reading is a mapping with ``timestamp`` and ``energy`` keys or a
+    two item list. Timestamps may be datetimes, ISO 8601 strings or epoch
+    seconds.
+    """
+    parsed = []
+    for position, reading in enumerate(readings):
+        try:
+            if isinstance(reading, dict):
+                timestamp, energy = reading[CONF_TIMESTAMP], reading[CONF_ENERGY]
+            else:
+                timestamp, energy = reading
+            if isinstance(timestamp, (int, float)):
+                timestamp = dt_util.utc_from_timestamp(timestamp)
+            elif not isinstance(timestamp, datetime):
+                timestamp = dt_util.parse_datetime(str(timestamp), raise_on_error=True)
+            parsed.append((_as_local(timestamp, tzinfo), float(energy)))
+        except (KeyError, TypeError, ValueError) as err:
+            raise ServiceValidationError(f"Invalid reading at index {position}") from err
+    return parsed
+
+
+async def _async_meter_values(
+    hass: HomeAssistant, entity_id: str, start: datetime, end: datetime
+) -> list[tuple[datetime, float]]:
+    """Return recorded (timestamp, total) values of an energy meter."""
+    if "recorder" not in hass.config.components:
+        raise ServiceValidationError("The recorder is required to read sensor history")
+    from homeassistant.components.recorder import get_instance, history
+
+    states = await get_instance(hass).async_add_executor_job(
+        partial(
+            history.state_changes_during_period,
+            hass,
+            dt_util.as_utc(start),
+            dt_util.as_utc(end),
+            entity_id,
+            no_attributes=True,
+            include_start_time_state=True,
+        )
+    )
+    values = []
+    for state in states.get(entity_id, []):
+        if state.state in (STATE_UNKNOWN, STATE_UNAVAILABLE):
+            continue
+        try:
+            total = float(state.state)
+        except ValueError:
+            continue
+        values.append((max(start, state.last_updated.astimezone(start.tzinfo)), total))
+    return values
+
+
+@callback
+def async_setup_services(hass: HomeAssistant) -> None:
+    """Register the TOU schedule services."""
+
+    async def _async_set_rates(call: ServiceCall) -> None:
+        coordinator = get_coordinator(hass, call.data.get(CONF_ENTRY_ID))
+        try:
+            await coordinator.async_set_rates(call.data[CONF_RATES], immediate=True)
+        except ValueError as err:
+            raise ServiceValidationError(str(err)) from err
+
+    async def _async_get_prices(call: ServiceCall) -> ServiceResponse:
+        coordinator = get_coordinator(hass, call.data.get(CONF_ENTRY_ID))
+        start, end = _local_range(hass, call.data)
+        return {
+            "segments": [
+                {
+                    "start": segment_start.isoformat(),
+                    "end": segment_end.isoformat(),
+                    "rate_type": rate.rate_type_id,
+                    "rate": rate.rate,
+                }
+                for segment_start, segment_end, rate in coordinator.get_schedule().iter_segments(
+                    start, end
+                )
+            ]
+        }
+
+    async def _async_calculate_cost(call: ServiceCall) -> ServiceResponse:
+        coordinator = get_coordinator(hass, call.data.get(CONF_ENTRY_ID))
+        if CONF_READINGS in call.data:
+            tzinfo = dt_util.get_time_zone(hass.config.time_zone)
+            intervals = intervals_from_readings(
+                _parse_readings(call.data[CONF_READINGS], tzinfo),
+                call.data[CONF_INTERVAL],
+            )
+        else:
+            if CONF_START not in call.data:
+                raise ServiceValidationError("start is required with entity_id")
+            start, end = _local_range(hass, call.data, end=dt_util.now())
+            intervals = intervals_from_meter(
+                await _async_meter_values(hass, call.data[CONF_ENTITY_ID], start, end)
+            )
+        return calculate_cost(coordinator.get_schedule(), intervals).as_dict()
+
+    async def _async_find_cheapest_window(call: ServiceCall) -> ServiceResponse:
+        coordinator = get_coordinator(hass, call.data.get(CONF_ENTRY_ID))
+        start, end = _local_range(hass, call.data)
+        window = coordinator.find_cheapest_window(
+            start, end, call.data[CONF_DURATION], call.data[CONF_CONTIGUOUS]
+        )
+        if window is None:
+            raise ServiceValidationError("duration does not fit between start and end")
+        return window.as_dict()
+
+    hass.services.async_register(
+        DOMAIN, SERVICE_SET_RATES, _async_set_rates, schema=SET_RATES_SCHEMA
+    )
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_GET_PRICES,
+        _async_get_prices,
+        schema=GET_PRICES_SCHEMA,
+        supports_response=SupportsResponse.ONLY,
+    )
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_CALCULATE_COST,
+        _async_calculate_cost,
+        schema=CALCULATE_COST_SCHEMA,
+        supports_response=SupportsResponse.ONLY,
+    )
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_FIND_CHEAPEST_WINDOW,
+        _async_find_cheapest_window,
+        schema=FIND_CHEAPEST_WINDOW_SCHEMA,
+        supports_response=SupportsResponse.ONLY,
+    )
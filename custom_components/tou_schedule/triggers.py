@@ -1,20 +1,30 @@
 """Trigger platform for TOU schedule."""
 from __future__ import annotations
 
+from datetime import datetime, timedelta
 from typing import Any, Callable
 
 import voluptuous as vol
 
-from homeassistant.const import CONF_EVENT, CONF_PLATFORM
-from homeassistant.core import HomeAssistant, callback
+from homeassistant.const import CONF_DEVICE_ID, CONF_EVENT, CONF_OFFSET, CONF_PLATFORM
+from homeassistant.core import CALLBACK_TYPE, HassJob, HomeAssistant, callback
+from homeassistant.exceptions import HomeAssistantError
 from homeassistant.helpers import config_validation as cv
+from homeassistant.helpers.event import async_track_point_in_time
 from homeassistant.helpers.trigger import TriggerActionType
 from homeassistant.helpers.typing import ConfigType
+from homeassistant.helpers.update_coordinator import UpdateFailed
+from homeassistant.util import dt as dt_util
 
 from . import TouScheduleCoordinator, get_active_rate_type
+from .helpers import find_coordinator
+from .scheduler import ActiveRate, CompiledSchedule
 from .const import (
+    CONF_ENTRY_ID,
     CONF_RATE_TYPE,
+    DATA_TRIGGER_DISPATCHERS,
     DOMAIN,
+    NEXT_TRANSITION_LIMIT_HOURS,
     TRIGGER_PERIOD_ENDED,
     TRIGGER_PERIOD_STARTED,
     TRIGGER_RATE_ENTERED,
@@ -33,10 +43,162 @@ TRIGGER_SCHEMA = cv.TRIGGER_BASE_SCHEMA.extend(
             ]
         ),
         vol.Optional(CONF_RATE_TYPE): str,
+        vol.Optional(CONF_OFFSET): cv.time_period,
+        vol.Exclusive(CONF_ENTRY_ID, "entry"): cv.string,
+        vol.Exclusive(CONF_DEVICE_ID, "entry"): cv.string,
     }
 )
 
 
+def _transition_events(previous: ActiveRate, current: ActiveRate) -> list[tuple[str, str | None]]:
+    """Return the (event, rate type id) pairs for a change between two rates."""
+    events: list[tuple[str, str | None]] = []
+    if current.rate_type_id != previous.rate_type_id:
+        events.append((TRIGGER_RATE_EXITED, previous.rate_type_id))
+        events.append((TRIGGER_RATE_ENTERED, current.rate_type_id))
+    if current.rule_id != previous.rule_id:
+        if previous.rule_id is not None:
+            events.append((TRIGGER_PERIOD_ENDED, previous.rate_type_id))
+        if current.rule_id is not None:
+            events.append((TRIGGER_PERIOD_STARTED, current.rate_type_id))
+    return events
+
+
+def _next_event(
+    schedule: CompiledSchedule,
+    start: datetime,
+    end: datetime,
+    event: str,
+    rate_type: str | None,
+) -> tuple[datetime, str | None] | None:
+    """Return the first matching event after ``start`` and before ``end``."""
+    previous: ActiveRate | None = None
+    for segment_start, _, rate in schedule.iter_segments(start, end):
+        if previous is not None:
+            for candidate, rate_type_id in _transition_events(previous, rate):
+                if candidate == event and (not rate_type or rate_type_id == rate_type):
+                    return segment_start, rate_type_id
+        previous = rate
+    return None
+
+
+class TriggerDispatcher:
+    """Deliver the transition events of one entry to its triggers.
+
+    Events are computed once per coordinator update and looked up by
+    (event, rate type), so an update costs one lookup per event however many
+    triggers are attached. Triggers without a rate type filter are keyed on
+    (event, None). Schedule listeners are only called when the schedule
+    fingerprint changes.
+    """
+
+    def __init__(self, hass: HomeAssistant, coordinator: TouScheduleCoordinator) -> None:
+        self.hass = hass
+        self.coordinator = coordinator
+        self._triggers: dict[tuple[str, str | None], list[tuple[HassJob, dict[str, Any]]]] = {}
+        self._schedule_listeners: list[CALLBACK_TYPE] = []
+        self._last_rate = get_active_rate_type(coordinator)
+        self._fingerprint = coordinator.schedule.fingerprint if coordinator.schedule else None
+        self._unsub_coordinator: CALLBACK_TYPE | None = None
+
+    @callback
+    def async_add_trigger(
+        self, event: str, rate_type: str | None, job: HassJob, trigger_info: dict[str, Any]
+    ) -> CALLBACK_TYPE:
+        """Run ``job`` for each matching event until the returned callback is called."""
+        key = (event, rate_type or None)
+        registration = (job, trigger_info)
+        self._triggers.setdefault(key, []).append(registration)
+        self._async_subscribe()
+
+        @callback
+        def _remove() -> None:
+            registrations = self._triggers[key]
+            registrations.remove(registration)
+            if not registrations:
+                del self._triggers[key]
+            self._async_unsubscribe_if_unused()
+
+        return _remove
+
+    @callback
+    def async_add_schedule_listener(self, listener: CALLBACK_TYPE) -> CALLBACK_TYPE:
+        """Call ``listener`` whenever the schedule changes."""
+        self._schedule_listeners.append(listener)
+        self._async_subscribe()
+
+        @callback
+        def _remove() -> None:
+            self._schedule_listeners.remove(listener)
+            self._async_unsubscribe_if_unused()
+
+        return _remove
+
+    @callback
+    def _async_subscribe(self) -> None:
+        if self._unsub_coordinator is None:
+            self._unsub_coordinator = self.coordinator.async_add_listener(
+                self._handle_coordinator_update
+            )
+
+    @callback
+    def _async_unsubscribe_if_unused(self) -> None:
+        if self._triggers or self._schedule_listeners:
+            return
+        if self._unsub_coordinator is not None:
+            self._unsub_coordinator()
+            self._unsub_coordinator = None
+        dispatchers = self.hass.data.get(DATA_TRIGGER_DISPATCHERS, {})
+        if dispatchers.get(self.coordinator.entry.entry_id) is self:
+            del dispatchers[self.coordinator.entry.entry_id]
+
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        current_rate = get_active_rate_type(self.coordinator)
+        events = _transition_events(self._last_rate, current_rate)
+        self._last_rate = current_rate
+        for event, rate_type_id in events:
+            for key in ((event, rate_type_id), (event, None)):
+                # Copied so an action may detach its trigger while running.
+                for job, trigger_info in list(self._triggers.get(key, ())):
+                    self.hass.async_run_hass_job(
+                        job,
+                        {
+                            "trigger": {
+                                **trigger_info,
+                                "platform": DOMAIN,
+                                "entry_id": self.coordinator.entry.entry_id,
+                                "event": event,
+                                "rate_type": rate_type_id,
+                            }
+                        },
+                        self.hass,
+                    )
+
+        schedule = self.coordinator.schedule
+        fingerprint = schedule.fingerprint if schedule is not None else None
+        if fingerprint != self._fingerprint:
+            self._fingerprint = fingerprint
+            for listener in list(self._schedule_listeners):
+                listener()
+
+
+@callback
+def async_get_dispatcher(
+    hass: HomeAssistant, coordinator: TouScheduleCoordinator
+) -> TriggerDispatcher:
+    """Return the trigger dispatcher of a coordinator, creating it if needed."""
+    dispatchers: dict[str, TriggerDispatcher] = hass.data.setdefault(
+        DATA_TRIGGER_DISPATCHERS, {}
+    )
+    entry_id = coordinator.entry.entry_id
+    dispatcher = dispatchers.get(entry_id)
+    if dispatcher is None or dispatcher.coordinator is not coordinator:
+        # A reloaded entry gets a new coordinator and so a new dispatcher.
+        dispatcher = dispatchers[entry_id] = TriggerDispatcher(hass, coordinator)
+    return dispatcher
+
+
 async def async_validate_trigger_config(hass: HomeAssistant, config: ConfigType) -> ConfigType:
     return TRIGGER_SCHEMA(config)
 
@@ -47,52 +209,105 @@ async def async_attach_trigger(
     action: TriggerActionType,
     trigger_info: dict[str, Any],
 ) -> Callable[[], None]:
-    entries = list(hass.data.get(DOMAIN, {}).values())
-    if not entries:
-        raise ValueError("No TOU schedule configuration entries found")
-    if len(entries) > 1:
-        raise ValueError("Multiple TOU schedule entries found; use a single entry for triggers")
-    coordinator: TouScheduleCoordinator = entries[0]
+    try:
+        coordinator = find_coordinator(
+            hass, config.get(CONF_ENTRY_ID), config.get(CONF_DEVICE_ID)
+        )
+    except ValueError as err:
+        raise HomeAssistantError(str(err)) from err
+    dispatcher = async_get_dispatcher(hass, coordinator)
+    job = HassJob(action, f"{DOMAIN} trigger {trigger_info}")
+    if CONF_OFFSET in config:
+        return _async_attach_offset_trigger(hass, dispatcher, config, job, trigger_info)
+    return dispatcher.async_add_trigger(
+        config[CONF_EVENT], config.get(CONF_RATE_TYPE), job, trigger_info
+    )
+
+
+@callback
+def _async_attach_offset_trigger(
+    hass: HomeAssistant,
+    dispatcher: TriggerDispatcher,
+    config: ConfigType,
+    job: HassJob,
+    trigger_info: dict[str, Any],
+) -> Callable[[], None]:
+    """Attach a trigger that fires at a fixed offset from matching events.
+
+    The next matching event is found from the schedule segments and a single
+    point in time callback is scheduled at the event plus the offset. It is
+    rescheduled after firing and when the schedule changes, never polled.
+    """
+    coordinator = dispatcher.coordinator
     target_event = config[CONF_EVENT]
     target_rate_type = config.get(CONF_RATE_TYPE)
-    last_rate = get_active_rate_type(coordinator)
+    offset: timedelta = config[CONF_OFFSET]
+    horizon = timedelta(hours=NEXT_TRANSITION_LIMIT_HOURS)
+    unsub_timer: CALLBACK_TYPE | None = None
 
     @callback
-    def _handle_coordinator_update() -> None:
-        nonlocal last_rate
-        current_rate = get_active_rate_type(coordinator)
-        events: list[tuple[str, str | None]] = []
-        if current_rate.rate_type_id != last_rate.rate_type_id:
-            events.append((TRIGGER_RATE_EXITED, last_rate.rate_type_id))
-            events.append((TRIGGER_RATE_ENTERED, current_rate.rate_type_id))
-        if current_rate.rule_id != last_rate.rule_id:
-            if last_rate.rule_id is not None:
-                events.append((TRIGGER_PERIOD_ENDED, last_rate.rate_type_id))
-            if current_rate.rule_id is not None:
-                events.append((TRIGGER_PERIOD_STARTED, current_rate.rate_type_id))
-        last_rate = current_rate
+    def _cancel_timer() -> None:
+        nonlocal unsub_timer
+        if unsub_timer is not None:
+            unsub_timer()
+            unsub_timer = None
 
-        for event, rate_type_id in events:
-            if event != target_event:
-                continue
-            if target_rate_type and rate_type_id != target_rate_type:
-                continue
+    @callback
+    def _schedule_next(after: datetime) -> None:
+        """Schedule the callback for the first event after ``after``."""
+        nonlocal unsub_timer
+        _cancel_timer()
+        try:
+            schedule = coordinator.get_schedule()
+        except UpdateFailed:
+            # Retried when a valid schedule is applied.
+            return
+        # Events closer than a negative offset can no longer fire ahead of time.
+        start = max(after, dt_util.now() - offset)
+        end = start + horizon
+        found = _next_event(schedule, start, end, target_event, target_rate_type)
+        if found is None:
+
+            @callback
+            def _search_further(_now: datetime) -> None:
+                _schedule_next(end)
+
+            unsub_timer = async_track_point_in_time(hass, _search_further, end + offset)
+            return
+        event_time, rate_type_id = found
+
+        @callback
+        def _fire(_now: datetime) -> None:
+            nonlocal unsub_timer
+            unsub_timer = None
             hass.async_run_hass_job(
-                action,
+                job,
                 {
                     "trigger": {
                         **trigger_info,
                         "platform": DOMAIN,
-                        "event": event,
+                        "entry_id": coordinator.entry.entry_id,
+                        "event": target_event,
                         "rate_type": rate_type_id,
+                        "offset": offset,
+                        "transition": event_time,
                     }
                 },
                 hass,
             )
+            _schedule_next(event_time)
+
+        unsub_timer = async_track_point_in_time(hass, _fire, event_time + offset)
+
+    @callback
+    def _handle_schedule_change() -> None:
+        _schedule_next(dt_util.now() - offset)
 
-    unsub = coordinator.async_add_listener(_handle_coordinator_update)
+    _schedule_next(dt_util.now() - offset)
+    unsub = dispatcher.async_add_schedule_listener(_handle_schedule_change)
 
     def _unsub() -> None:
         unsub()
+        _cancel_timer()
 
     return _unsub
@@ -1,6 +1,8 @@
 """Validation helpers for TOU schedule."""
 from __future__ import annotations
 
+from bisect import bisect_left
+import calendar
 from dataclasses import dataclass
 from datetime import time
 from typing import Any
@@ -10,6 +12,7 @@ from .const import (
     CONF_END,
     CONF_ID,
     CONF_MONTHS,
+    CONF_NAME,
     CONF_PERIODS,
     CONF_RATE_TYPE,
     CONF_START,
@@ -17,12 +20,39 @@ from .const import (
 )
 
 
+@dataclass(frozen=True)
+class RuleConflict:
+    """Overlap between two rules."""
+
+    rule_id: str
+    other_rule_id: str
+    months: tuple[int, ...]
+    weekdays: tuple[int, ...]
+    ranges: tuple[tuple[int, int], ...]
+
+    def describe(self, names: dict[str, str] | None = None) -> str:
+        """Return a one-line summary of the conflict."""
+        names = names or {}
+        months = ", ".join(calendar.month_abbr[month] for month in self.months)
+        weekdays = ", ".join(calendar.day_abbr[weekday] for weekday in self.weekdays)
+        ranges = ", ".join(
+            f"{start // 60:02d}:{start % 60:02d}-{end // 60:02d}:{end % 60:02d}"
+            for start, end in self.ranges
+        )
+        return (
+            f"{names.get(self.rule_id, self.rule_id)} and "
+            f"{names.get(self.other_rule_id, self.other_rule_id)} "
+            f"({months}; {weekdays}; {ranges})"
+        )
+
+
 @dataclass(frozen=True)
 class ValidationResult:
     """Validation result."""
 
     valid: bool
     message: str | None = None
+    conflicts: tuple[RuleConflict, ...] = ()
 
 
 def _parse_time(value: str) -> time:
@@ -75,40 +105,253 @@ def _rule_dimensions(rule: dict[str, Any]) -> tuple[set[int], set[int]]:
     return months, weekdays
 
 
-def validate_rule_overlaps(rules: list[dict[str, Any]]) -> ValidationResult:
+def _day_mask(rule: dict[str, Any]) -> int:
+    """Return a 12 * 7 bit mask of the month/weekday days a rule applies to."""
+    months, weekdays = _rule_dimensions(rule)
+    week = sum(1 << weekday for weekday in weekdays)
+    return sum(week << ((month - 1) * 7) for month in months)
+
+
+def _period_minutes(rule: dict[str, Any]) -> list[tuple[int, int]]:
+    periods = []
+    for period in rule.get(CONF_PERIODS, []):
+        start = _minutes(_parse_time(period[CONF_START]))
+        end = _minutes(_parse_time(period[CONF_END]))
+        if start < end:
+            periods.append((start, end))
+    return periods
+
+
+def _intervals_by_day(
+    rules: list[dict[str, Any]],
+) -> dict[int, list[tuple[int, int, int]]]:
+    """Return (start, end, rule index) intervals for each day bit, sorted."""
+    by_day: dict[int, list[tuple[int, int, int]]] = {}
     for index, rule in enumerate(rules):
+        periods = _period_minutes(rule)
+        if not periods:
+            continue
+        mask = _day_mask(rule)
+        while mask:
+            low = mask & -mask
+            day = low.bit_length() - 1
+            by_day.setdefault(day, []).extend(
+                (start, end, index) for start, end in periods
+            )
+            mask ^= low
+    for intervals in by_day.values():
+        intervals.sort()
+    return by_day
+
+
+def _first_conflict(intervals: list[tuple[int, int, int]]) -> tuple[int, int] | None:
+    """Sweep sorted intervals and return the first pair of rules that overlap.
+
+    Tracks the furthest end seen and the furthest end owned by any other
+    rule, so overlapping periods of the same rule are not reported.
+    """
+    best_end = -1
+    best_owner = -1
+    other_end = -1
+    other_owner = -1
+    for start, end, owner in intervals:
+        if owner != best_owner and start < best_end:
+            return best_owner, owner
+        if owner == best_owner and start < other_end:
+            return other_owner, owner
+        if end > best_end:
+            if owner != best_owner:
+                other_end, other_owner = best_end, best_owner
+            best_end, best_owner = end, owner
+        elif owner != best_owner and end > other_end:
+            other_end, other_owner = end, owner
+    return None
+
+
+def _overlapping_ranges(
+    intervals: list[tuple[int, int, int]],
+) -> list[tuple[int, int, int, int]]:
+    """Return (rule, other rule, start, end) for every overlap in sorted intervals."""
+    overlaps = []
+    active: list[tuple[int, int]] = []
+    for start, end, owner in intervals:
+        active = [(other_end, other) for other_end, other in active if other_end > start]
+        for other_end, other in active:
+            if other != owner:
+                overlaps.append((min(other, owner), max(other, owner), start, min(end, other_end)))
+        active.append((end, owner))
+    return overlaps
+
+
+def _merge_ranges(ranges: set[tuple[int, int]]) -> tuple[tuple[int, int], ...]:
+    merged: list[tuple[int, int]] = []
+    for start, end in sorted(ranges):
+        if merged and start <= merged[-1][1]:
+            merged[-1] = (merged[-1][0], max(end, merged[-1][1]))
+        else:
+            merged.append((start, end))
+    return tuple(merged)
+
+
+def find_rule_conflicts(rules: list[dict[str, Any]]) -> list[RuleConflict]:
+    """Return every pair of overlapping rules, in rule order."""
+    days: dict[tuple[int, int], set[int]] = {}
+    ranges: dict[tuple[int, int], set[tuple[int, int]]] = {}
+    for day, intervals in _intervals_by_day(rules).items():
+        for index, other, start, end in _overlapping_ranges(intervals):
+            days.setdefault((index, other), set()).add(day)
+            ranges.setdefault((index, other), set()).add((start, end))
+    return [
+        RuleConflict(
+            rule_id=rules[index][CONF_ID],
+            other_rule_id=rules[other][CONF_ID],
+            months=tuple(sorted({day // 7 + 1 for day in days[(index, other)]})),
+            weekdays=tuple(sorted({day % 7 for day in days[(index, other)]})),
+            ranges=_merge_ranges(ranges[(index, other)]),
+        )
+        for index, other in sorted(days)
+    ]
+
+
+def _conflict_summary(
+    rules: list[dict[str, Any]],
+    conflicts: list[RuleConflict],
+) -> str:
+    names = {rule[CONF_ID]: rule.get(CONF_NAME, rule[CONF_ID]) for rule in rules}
+    details = "; ".join(conflict.describe(names) for conflict in conflicts)
+    return f"Rules cannot overlap in time. {len(conflicts)} conflict(s): {details}"
+
+
+def validate_rule_overlaps(
+    rules: list[dict[str, Any]],
+    full_report: bool = False,
+) -> ValidationResult:
+    """Validate rule periods and overlaps.
+
+    By default validation stops at the first problem. With ``full_report``
+    every conflicting rule pair is collected and summarized in the message.
+    """
+    for rule in rules:
         result = validate_rule_periods(rule)
         if not result.valid:
             return result
-        rule_months, rule_weekdays = _rule_dimensions(rule)
-        rule_periods = [
-            (_minutes(_parse_time(period[CONF_START])), _minutes(_parse_time(period[CONF_END])))
-            for period in rule.get(CONF_PERIODS, [])
-        ]
-        for other in rules[index + 1 :]:
-            other_months, other_weekdays = _rule_dimensions(other)
-            if not (rule_months & other_months) or not (rule_weekdays & other_weekdays):
-                continue
-            other_periods = [
-                (
-                    _minutes(_parse_time(period[CONF_START])),
-                    _minutes(_parse_time(period[CONF_END])),
-                )
-                for period in other.get(CONF_PERIODS, [])
-            ]
-            for start, end in rule_periods:
-                for other_start, other_end in other_periods:
-                    if max(start, other_start) < min(end, other_end):
-                        return ValidationResult(False, "Rules cannot overlap in time.")
+    if full_report:
+        conflicts = find_rule_conflicts(rules)
+        if conflicts:
+            return ValidationResult(
+                False, _conflict_summary(rules, conflicts), tuple(conflicts)
+            )
+        return ValidationResult(True)
+    for intervals in _intervals_by_day(rules).values():
+        if _first_conflict(intervals) is not None:
+            return ValidationResult(False, "Rules cannot overlap in time.")
     return ValidationResult(True)
 
 
 def validate_rules(
     rules: list[dict[str, Any]],
     rate_types: list[dict[str, Any]],
+    full_report: bool = False,
 ) -> ValidationResult:
     rate_type_ids = {rate_type[CONF_ID] for rate_type in rate_types}
     for rule in rules:
         if rule.get(CONF_RATE_TYPE) not in rate_type_ids:
             return ValidationResult(False, "Rule references unknown rate type.")
-    return validate_rule_overlaps(rules)
+    ids = [rule[CONF_ID] for rule in rules if CONF_ID in rule]
+    if len(ids) != len(set(ids)):
+        return ValidationResult(False, "Rule IDs must be unique.")
+    return validate_rule_overlaps(rules, full_report)
+
+
+class RuleOccupancyIndex:
+    """Occupied minute ranges of every rule except the one being edited.
+
+    Built once per edited rule, so validating a change to that rule only
+    costs a bisect per period and day instead of re-validating all rules.
+    If the other rules are not valid on their own, validation falls back to
+    the full ``validate_rules`` check.
+    """
+
+    def __init__(self, rules: list[dict[str, Any]], rule_id: str) -> None:
+        self.rule_id = rule_id
+        self._rules = list(rules)
+        self._others = [rule for rule in rules if rule[CONF_ID] != rule_id]
+        self._positions = {rule[CONF_ID]: index for index, rule in enumerate(rules)}
+        by_day = _intervals_by_day(self._others)
+        self._consistent = all(
+            validate_rule_periods(rule).valid for rule in self._others
+        ) and all(_first_conflict(intervals) is None for intervals in by_day.values())
+        self._days = {
+            day: (
+                [start for start, _, _ in intervals],
+                [end for _, end, _ in intervals],
+                [self._others[owner][CONF_ID] for _, _, owner in intervals],
+            )
+            for day, intervals in by_day.items()
+        }
+
+    def _full_rules(self, rule: dict[str, Any]) -> list[dict[str, Any]]:
+        if rule[CONF_ID] not in self._positions:
+            return self._rules + [rule]
+        return [rule if item[CONF_ID] == rule[CONF_ID] else item for item in self._rules]
+
+    def validate_rule(
+        self,
+        rule: dict[str, Any],
+        rate_types: list[dict[str, Any]],
+        full_report: bool = False,
+    ) -> ValidationResult:
+        """Validate an edited version of the indexed rule against the others."""
+        if not self._consistent or rule[CONF_ID] != self.rule_id:
+            return validate_rules(self._full_rules(rule), rate_types, full_report)
+        if rule.get(CONF_RATE_TYPE) not in {rate_type[CONF_ID] for rate_type in rate_types}:
+            return ValidationResult(False, "Rule references unknown rate type.")
+        result = validate_rule_periods(rule)
+        if not result.valid:
+            return result
+
+        days: dict[str, set[int]] = {}
+        ranges: dict[str, set[tuple[int, int]]] = {}
+        periods = _period_minutes(rule)
+        mask = _day_mask(rule) if periods else 0
+        while mask:
+            low = mask & -mask
+            day = low.bit_length() - 1
+            mask ^= low
+            if day not in self._days:
+                continue
+            starts, ends, owners = self._days[day]
+            for start, end in periods:
+                # Other rules do not overlap each other, so their intervals are
+                # sorted by end as well as start.
+                index = bisect_left(starts, end) - 1
+                while index >= 0 and ends[index] > start:
+                    if not full_report:
+                        return ValidationResult(False, "Rules cannot overlap in time.")
+                    owner = owners[index]
+                    days.setdefault(owner, set()).add(day)
+                    ranges.setdefault(owner, set()).add(
+                        (max(start, starts[index]), min(end, ends[index]))
+                    )
+                    index -= 1
+        if not days:
+            return ValidationResult(True)
+
+        position = self._positions.get(rule[CONF_ID], len(self._rules))
+        conflicts = []
+        for owner in sorted(days, key=self._positions.__getitem__):
+            pair = (rule[CONF_ID], owner)
+            if self._positions[owner] < position:
+                pair = (owner, rule[CONF_ID])
+            conflicts.append(
+                RuleConflict(
+                    rule_id=pair[0],
+                    other_rule_id=pair[1],
+                    months=tuple(sorted({day // 7 + 1 for day in days[owner]})),
+                    weekdays=tuple(sorted({day % 7 for day in days[owner]})),
+                    ranges=_merge_ranges(ranges[owner]),
+                )
+            )
+        return ValidationResult(
+            False, _conflict_summary(self._full_rules(rule), conflicts), tuple(conflicts)
+        )
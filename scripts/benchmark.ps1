@@ -0,0 +1,15 @@
+$ErrorActionPreference = "Stop"
+
+$root = Resolve-Path (Join-Path $PSScriptRoot "..")
+Set-Location $root
+
+if (-not (Test-Path ".venv")) {
+    python -m venv .venv
+}
+
+& .\.venv\Scripts\python -m pip install --upgrade "pip<23.2"
+& .\.venv\Scripts\python -m pip install -r requirements_test.txt
+$env:PYTEST_DISABLE_PLUGIN_AUTOLOAD = "1"
+# The runner compares against this machine type's baseline and fails when
+# there is none; pytest-benchmark stores baselines per platform.
+& .\.venv\Scripts\python scripts/benchmark.py -p pytest_asyncio.plugin -p pytest_homeassistant_custom_component.plugins -p pytest_benchmark.plugin -p no:pytest_socket @args
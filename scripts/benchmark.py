@@ -0,0 +1,69 @@
+"""Run the benchmark suite and fail on regressions against the stored baseline.
+
+pytest-benchmark keeps baselines per machine type (for example
+``Linux-CPython-3.11-64bit``) and ``--benchmark-compare`` without a file only
+looks at the current one, so on another platform it finds nothing and the
+regression gate silently passes. This runner passes the baseline file
+explicitly and fails when there is none for this machine.
+
+Usage::
+
+    python scripts/benchmark.py [--baseline FILE] [pytest args...]
+    python scripts/benchmark.py --save NAME [pytest args...]
+"""
+from __future__ import annotations
+
+import argparse
+from pathlib import Path
+import subprocess
+import sys
+
+from pytest_benchmark.utils import get_machine_id
+
+ROOT = Path(__file__).resolve().parents[1]
+STORAGE = ROOT / "tests" / "benchmarks" / ".benchmarks"
+COMPARE_FAIL = "min:25%"
+
+
+def latest_baseline(machine_id: str) -> Path | None:
+    """Return the newest baseline recorded for a machine type."""
+    baselines = sorted((STORAGE / machine_id).glob("*.json"))
+    return baselines[-1] if baselines else None
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--baseline", type=Path, help="baseline file to compare against")
+    parser.add_argument("--save", metavar="NAME", help="record a new baseline instead")
+    args, pytest_args = parser.parse_known_args()
+
+    command = [
+        sys.executable,
+        "-m",
+        "pytest",
+        "-q",
+        str(ROOT / "tests" / "benchmarks"),
+        f"--benchmark-storage={STORAGE}",
+    ]
+    if args.save:
+        command.append(f"--benchmark-save={args.save}")
+    else:
+        machine_id = get_machine_id()
+        baseline = args.baseline or latest_baseline(machine_id)
+        if baseline is None or not baseline.is_file():
+            print(
+                f"No benchmark baseline for {machine_id} in {STORAGE}.\n"
+                "Record one on this machine with: python scripts/benchmark.py --save baseline",
+                file=sys.stderr,
+            )
+            return 2
+        print(f"Comparing against {baseline}")
+        command += [
+            f"--benchmark-compare={baseline.resolve()}",
+            f"--benchmark-compare-fail={COMPARE_FAIL}",
+        ]
+    return subprocess.call(command + pytest_args, cwd=ROOT)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
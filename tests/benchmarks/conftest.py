@@ -0,0 +1,53 @@
+"""Synthetic tariffs for the benchmark suite."""
+from math import ceil
+
+import pytest
+
+RULE_COUNTS = [1, 10, 100, 500]
+MAX_PERIODS = 8
+DAY_KEYS = [(month, weekday) for month in range(1, 13) for weekday in range(7)]
+
+
+def _time(minute):
+    return f"{minute // 60:02d}:{minute % 60:02d}"
+
+
+def synthetic_tariff(rule_count):
+    """Return (rate_types, rules) with valid, non-overlapping rules.
+
+    Rule ``i`` applies to one month/weekday combination and has 1 to 8
+    periods. Rules sharing a day are given separate lanes of the day, so the
+    tariff passes validation and the validators do their full work.
+    """
+    rate_types = [
+        {"id": "default", "name": "Default", "rate": 0.1, "default": True},
+        {"id": "peak", "name": "Peak", "rate": 0.3, "default": False},
+        {"id": "mid", "name": "Mid", "rate": 0.2, "default": False},
+    ]
+    lanes = ceil(rule_count / len(DAY_KEYS))
+    width = 24 * 60 // (lanes * MAX_PERIODS)
+    rules = []
+    for index in range(rule_count):
+        month, weekday = DAY_KEYS[index % len(DAY_KEYS)]
+        lane = index // len(DAY_KEYS)
+        periods = []
+        for period in range(1 + index % MAX_PERIODS):
+            start = (period * lanes + lane) * width
+            periods.append({"start": _time(start), "end": _time(start + width - 1)})
+        rules.append(
+            {
+                "id": f"rule{index}",
+                "name": f"Rule {index}",
+                "rate_type": ("peak", "mid")[index % 2],
+                "months": [month],
+                "weekdays": [weekday],
+                "periods": periods,
+            }
+        )
+    return rate_types, rules
+
+
+@pytest.fixture(params=RULE_COUNTS, ids=[f"{count}_rules" for count in RULE_COUNTS])
+def tariff(request):
+    """Return a synthetic (rate_types, rules) tariff."""
+    return synthetic_tariff(request.param)
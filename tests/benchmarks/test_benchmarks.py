@@ -0,0 +1,101 @@
+"""Benchmarks for the schedule hot paths.
+
+The module-level wrappers are measured next to the CompiledSchedule methods
+the coordinator calls on every refresh.
+
+Not part of the default test run; see the Development section of the README.
+"""
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from pytest_homeassistant_custom_component.common import MockConfigEntry
+
+from custom_components.tou_schedule.const import (
+    CONF_RATE_TYPES,
+    CONF_REFRESH_MODE,
+    CONF_RULES,
+    DOMAIN,
+    REFRESH_MODE_POLL,
+)
+from custom_components.tou_schedule.scheduler import (
+    CompiledSchedule,
+    build_prices_for_day,
+    get_active_rate,
+    next_transition,
+)
+from custom_components.tou_schedule.validation import validate_rules
+
+pytest.importorskip("pytest_benchmark")
+
+NOW = datetime(2024, 3, 4, 12, 30, tzinfo=timezone.utc)
+INSTANTS = [
+    datetime(2024, 1, 1, tzinfo=timezone.utc) + timedelta(minutes=97 * step)
+    for step in range(1000)
+]
+
+
+def test_get_active_rate(benchmark, tariff):
+    rate_types, rules = tariff
+
+    benchmark(get_active_rate, rules, rate_types, NOW)
+
+
+def test_compiled_rate_at(benchmark, tariff):
+    schedule = CompiledSchedule(*tariff, lookup_table=True)
+
+    benchmark(lambda: [schedule.rate_at(instant) for instant in INSTANTS])
+
+
+def test_build_prices_for_day(benchmark, tariff):
+    rate_types, rules = tariff
+
+    benchmark(build_prices_for_day, NOW, rules, rate_types, timezone.utc)
+
+
+def test_compiled_prices_for_day(benchmark, tariff):
+    schedule = CompiledSchedule(*tariff, lookup_table=True)
+
+    benchmark(schedule.prices_for_day, NOW, timezone.utc)
+
+
+def test_next_transition(benchmark, tariff):
+    rate_types, rules = tariff
+
+    benchmark(next_transition, rules, rate_types, NOW, 24 * 31)
+
+
+def test_compiled_next_transition(benchmark, tariff):
+    schedule = CompiledSchedule(*tariff, lookup_table=True)
+
+    benchmark(schedule.next_transition, NOW, 24 * 31)
+
+
+def test_compile_schedule(benchmark, tariff):
+    benchmark(CompiledSchedule, *tariff, lookup_table=True)
+
+
+def test_validate_rules(benchmark, tariff):
+    rate_types, rules = tariff
+
+    assert benchmark(validate_rules, rules, rate_types).valid
+
+
+def test_coordinator_refresh(benchmark, tariff, hass, event_loop, enable_custom_integrations):
+    rate_types, rules = tariff
+    entry = MockConfigEntry(
+        domain=DOMAIN,
+        data={},
+        options={
+            CONF_RATE_TYPES: rate_types,
+            CONF_RULES: rules,
+            CONF_REFRESH_MODE: REFRESH_MODE_POLL,
+        },
+    )
+    entry.add_to_hass(hass)
+    assert event_loop.run_until_complete(hass.config_entries.async_setup(entry.entry_id))
+    coordinator = hass.data[DOMAIN][entry.entry_id]
+
+    benchmark(lambda: event_loop.run_until_complete(coordinator._async_update_data()))
+
+    assert event_loop.run_until_complete(hass.config_entries.async_unload(entry.entry_id))
+    event_loop.run_until_complete(hass.async_block_till_done())
@@ -6,19 +6,25 @@ from homeassistant.data_entry_flow import FlowResultType
 from pytest_homeassistant_custom_component.common import MockConfigEntry
 
 from custom_components.tou_schedule.const import (
+    CONF_CHEAPEST_WINDOW_HOURS,
     CONF_DEFAULT,
     CONF_END,
     CONF_ID,
     CONF_MONTHS,
     CONF_NAME,
     CONF_PERIODS,
+    CONF_PRICE_RESOLUTION,
     CONF_RATE,
     CONF_RATE_TYPE,
     CONF_RATE_TYPES,
+    CONF_REFRESH_MODE,
     CONF_RULES,
     CONF_START,
+    CONF_TARIFF,
     CONF_WEEKDAYS,
     DOMAIN,
+    PRICE_RESOLUTION_CHANGES,
+    REFRESH_MODE_POLL,
 )
 
 
@@ -520,3 +526,177 @@ async def test_rule_schema_uses_list_selectors(hass):
     else:
         assert weekdays_config.multiple is True
         assert weekdays_config.mode == selector.SelectSelectorMode.LIST
+
+
+@pytest.mark.asyncio
+async def test_options_flow_settings_refresh_mode(hass):
+    entry = MockConfigEntry(
+        domain=DOMAIN,
+        data={},
+        options={
+            CONF_RATE_TYPES: [
+                {CONF_ID: "default", CONF_NAME: "Default", CONF_RATE: 0.1, CONF_DEFAULT: True}
+            ]
+        },
+    )
+
+    result = await _init_options_flow(hass, entry)
+    result = await _goto_menu(hass, result["flow_id"], "settings")
+    assert result["type"] == FlowResultType.FORM
+    assert result["step_id"] == "settings"
+
+    result = await hass.config_entries.options.async_configure(
+        result["flow_id"],
+        {
+            CONF_REFRESH_MODE: REFRESH_MODE_POLL,
+            CONF_PRICE_RESOLUTION: PRICE_RESOLUTION_CHANGES,
+            CONF_CHEAPEST_WINDOW_HOURS: 2,
+        },
+    )
+    assert result["type"] == FlowResultType.MENU
+    assert result["step_id"] == "init"
+    assert entry.options[CONF_REFRESH_MODE] == REFRESH_MODE_POLL
+    assert entry.options[CONF_PRICE_RESOLUTION] == PRICE_RESOLUTION_CHANGES
+    assert entry.options[CONF_CHEAPEST_WINDOW_HOURS] == 2.0
+
+
+TARIFF_DOCUMENT = """
+rate_types:
+  - id: offpeak
+    name: Off Peak
+    rate: 0.1
+    default: true
+  - id: peak
+    name: Peak
+    rate: 0.3
+rules:
+  - id: summer
+    name: Summer Peak
+    rate_type: peak
+    months: [6, 7, 8]
+    weekdays: [0, 1, 2, 3, 4]
+    periods:
+      - start: "16:00"
+        end: "21:00"
+"""
+
+
+@pytest.mark.asyncio
+async def test_options_flow_tariff_import(hass):
+    entry = MockConfigEntry(
+        domain=DOMAIN,
+        data={},
+        options={
+            CONF_RATE_TYPES: [
+                {CONF_ID: "default", CONF_NAME: "Default", CONF_RATE: 0.1, CONF_DEFAULT: True}
+            ]
+        },
+    )
+
+    result = await _init_options_flow(hass, entry)
+    result = await _goto_menu(hass, result["flow_id"], "tariff_import")
+    assert result["type"] == FlowResultType.FORM
+
+    result = await hass.config_entries.options.async_configure(
+        result["flow_id"], {CONF_TARIFF: TARIFF_DOCUMENT}
+    )
+    assert result["type"] == FlowResultType.MENU
+    assert result["step_id"] == "init"
+    assert [rate[CONF_ID] for rate in entry.options[CONF_RATE_TYPES]] == ["offpeak", "peak"]
+    assert entry.options[CONF_RATE_TYPES][1][CONF_DEFAULT] is False
+    assert entry.options[CONF_RULES][0][CONF_PERIODS] == [{CONF_START: "16:00", CONF_END: "21:00"}]
+
+    result = await _goto_menu(hass, result["flow_id"], "tariff_export")
+    assert result["type"] == FlowResultType.FORM
+    assert "id: summer" in result["description_placeholders"][CONF_TARIFF]
+
+
+@pytest.mark.asyncio
+async def test_options_flow_tariff_import_reports_conflicts(hass):
+    entry = MockConfigEntry(
+        domain=DOMAIN,
+        data={},
+        options={
+            CONF_RATE_TYPES: [
+                {CONF_ID: "default", CONF_NAME: "Default", CONF_RATE: 0.1, CONF_DEFAULT: True}
+            ]
+        },
+    )
+    document = TARIFF_DOCUMENT + """
+  - id: overlap
+    name: Overlap
+    rate_type: offpeak
+    periods:
+      - start: "20:00"
+        end: "22:00"
+"""
+
+    result = await _init_options_flow(hass, entry)
+    result = await _goto_menu(hass, result["flow_id"], "tariff_import")
+    result = await hass.config_entries.options.async_configure(
+        result["flow_id"], {CONF_TARIFF: document}
+    )
+    assert result["type"] == FlowResultType.FORM
+    assert "Summer Peak and Overlap" in result["errors"]["base"]
+    assert [rate[CONF_ID] for rate in entry.options[CONF_RATE_TYPES]] == ["default"]
+
+    result = await hass.config_entries.options.async_configure(
+        result["flow_id"], {CONF_TARIFF: "rate_types: [1"}
+    )
+    assert result["type"] == FlowResultType.FORM
+    assert result["errors"]["base"].startswith("Invalid tariff document")
+
+
+@pytest.mark.asyncio
+async def test_options_flow_tariff_import_rejects_duplicate_rule_ids(hass):
+    entry = MockConfigEntry(
+        domain=DOMAIN,
+        data={},
+        options={
+            CONF_RATE_TYPES: [
+                {CONF_ID: "default", CONF_NAME: "Default", CONF_RATE: 0.1, CONF_DEFAULT: True}
+            ]
+        },
+    )
+    document = TARIFF_DOCUMENT + """
+  - id: summer
+    name: Summer Morning
+    rate_type: peak
+    periods:
+      - start: "07:00"
+        end: "09:00"
+"""
+
+    result = await _init_options_flow(hass, entry)
+    result = await _goto_menu(hass, result["flow_id"], "tariff_import")
+    result = await hass.config_entries.options.async_configure(
+        result["flow_id"], {CONF_TARIFF: document}
+    )
+    assert result["type"] == FlowResultType.FORM
+    assert result["errors"]["base"] == "Rule IDs must be unique."
+    assert CONF_RULES not in entry.options
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("tag", ["!env_var HOME", "!include /etc/hostname", "!secret api_key"])
+async def test_options_flow_tariff_import_rejects_custom_tags(hass, tag):
+    entry = MockConfigEntry(
+        domain=DOMAIN,
+        data={},
+        options={
+            CONF_RATE_TYPES: [
+                {CONF_ID: "default", CONF_NAME: "Default", CONF_RATE: 0.1, CONF_DEFAULT: True}
+            ]
+        },
+    )
+    document = TARIFF_DOCUMENT.replace("name: Summer Peak", f"name: {tag}")
+    assert tag in document
+
+    result = await _init_options_flow(hass, entry)
+    result = await _goto_menu(hass, result["flow_id"], "tariff_import")
+    result = await hass.config_entries.options.async_configure(
+        result["flow_id"], {CONF_TARIFF: document}
+    )
+    assert result["type"] == FlowResultType.FORM
+    assert result["errors"]["base"].startswith("Invalid tariff document")
+    assert CONF_RULES not in entry.options
@@ -0,0 +1,148 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from custom_components.tou_schedule.cost import (
+    WindowCache,
+    calculate_cost,
+    find_cheapest_window,
+    intervals_from_meter,
+    intervals_from_readings,
+)
+from custom_components.tou_schedule.scheduler import CompiledSchedule
+
+RATE_TYPES = [
+    {"id": "default", "name": "Default", "rate": 0.1, "default": True},
+    {"id": "peak", "name": "Peak", "rate": 0.3, "default": False},
+]
+RULES = [
+    {
+        "id": "rule1",
+        "name": "Peak",
+        "rate_type": "peak",
+        "months": [],
+        "weekdays": [],
+        "periods": [{"start": "16:00", "end": "21:00"}],
+    }
+]
+
+
+def test_calculate_cost_splits_intervals_at_rate_changes():
+    schedule = CompiledSchedule(RATE_TYPES, RULES)
+    start = datetime(2024, 1, 1, 15, 30, tzinfo=timezone.utc)
+
+    breakdown = calculate_cost(
+        schedule, intervals_from_readings([(start, 2.0)], timedelta(hours=1))
+    )
+
+    assert breakdown.energy == pytest.approx(2.0)
+    assert breakdown.rate_types["default"].energy == pytest.approx(1.0)
+    assert breakdown.rate_types["peak"].energy == pytest.approx(1.0)
+    assert breakdown.cost == pytest.approx(0.1 + 0.3)
+
+
+def test_calculate_cost_matches_per_minute_sum():
+    schedule = CompiledSchedule(RATE_TYPES, RULES)
+    start = datetime(2024, 1, 1, tzinfo=timezone.utc)
+    readings = [(start + timedelta(minutes=5 * step), 0.05) for step in range(12 * 24 * 7)]
+
+    breakdown = calculate_cost(
+        schedule, intervals_from_readings(readings, timedelta(minutes=5))
+    )
+
+    expected = sum(
+        0.01 * schedule.rate_at(start + timedelta(minutes=minute)).rate
+        for minute in range(24 * 60 * 7)
+    )
+    assert breakdown.cost == pytest.approx(expected)
+    assert breakdown.rate_types["peak"].rate_type_name == "Peak"
+
+
+def test_intervals_from_meter_handles_resets():
+    start = datetime(2024, 1, 1, tzinfo=timezone.utc)
+    values = [(start + timedelta(hours=hour), total) for hour, total in enumerate([10, 11, 13, 1])]
+
+    intervals = intervals_from_meter(values)
+
+    assert [energy for _, _, energy in intervals] == [1, 2, 1]
+    assert intervals[0][:2] == (start, start + timedelta(hours=1))
+
+
+def test_calculate_cost_empty():
+    breakdown = calculate_cost(CompiledSchedule(RATE_TYPES, RULES), [])
+
+    assert breakdown.as_dict() == {"energy": 0.0, "cost": 0.0, "rate_types": {}}
+
+
+def _brute_force_window(schedule, start, end, duration):
+    best = None
+    current = start
+    while current + duration <= end:
+        cost = sum(
+            schedule.rate_at(current + timedelta(minutes=minute)).rate
+            for minute in range(int(duration.total_seconds() // 60))
+        )
+        if best is None or cost < best[0] - 1e-9:
+            best = (cost, current)
+        current += timedelta(minutes=1)
+    return best[1]
+
+
+def test_find_cheapest_window_matches_brute_force():
+    rate_types = RATE_TYPES + [{"id": "mid", "name": "Mid", "rate": 0.2, "default": False}]
+    rules = RULES + [
+        {
+            "id": "rule2",
+            "name": "Shoulder",
+            "rate_type": "mid",
+            "months": [],
+            "weekdays": [],
+            "periods": [{"start": "07:00", "end": "09:30"}, {"start": "21:00", "end": "23:00"}],
+        }
+    ]
+    schedule = CompiledSchedule(rate_types, rules)
+    start = datetime(2024, 1, 1, 14, 10, tzinfo=timezone.utc)
+    end = start + timedelta(hours=20)
+    for hours in (1, 2.5, 9, 12):
+        duration = timedelta(hours=hours)
+
+        window = find_cheapest_window(schedule, start, end, duration)
+
+        assert window.start == _brute_force_window(schedule, start, end, duration)
+        assert window.end - window.start == duration
+
+
+def test_find_cheapest_window_non_contiguous():
+    schedule = CompiledSchedule(RATE_TYPES, RULES)
+    start = datetime(2024, 1, 1, 15, 0, tzinfo=timezone.utc)
+
+    window = find_cheapest_window(
+        schedule, start, start + timedelta(hours=7), timedelta(hours=2), contiguous=False
+    )
+
+    assert window.slots == (
+        (start, start + timedelta(hours=1)),
+        (start + timedelta(hours=6), start + timedelta(hours=7)),
+    )
+    assert window.average_rate == pytest.approx(0.1)
+    assert find_cheapest_window(schedule, start, start, timedelta(hours=1)) is None
+
+
+def test_window_cache_reuses_result_until_window_start():
+    schedule = CompiledSchedule(RATE_TYPES, RULES)
+    cache = WindowCache()
+    start = datetime(2024, 1, 1, 12, 0, tzinfo=timezone.utc)
+    end = start + timedelta(hours=12)
+    duration = timedelta(hours=3)
+
+    window = cache.find_cheapest_window(schedule, start, end, duration)
+
+    assert window.start == start
+    assert cache.find_cheapest_window(schedule, start, end, duration) is window
+    later = cache.find_cheapest_window(schedule, start + timedelta(minutes=30), end, duration)
+    assert later is not window
+    assert later.start == start + timedelta(minutes=30)
+    changed = CompiledSchedule([{**RATE_TYPES[0], "rate": 0.5}, RATE_TYPES[1]], RULES)
+    assert cache.find_cheapest_window(changed, start, end, duration).start == start + timedelta(
+        hours=4
+    )
@@ -39,6 +39,8 @@ assert spec.loader is not None
 spec.loader.exec_module(helpers)
 
 get_options = helpers.get_options
+get_options_snapshot = helpers.get_options_snapshot
+RefreshTimings = helpers.RefreshTimings
 
 
 def test_get_options_returns_lists():
@@ -53,3 +55,43 @@ def test_get_options_returns_lists():
 
     assert rate_types == [{"id": "default", "name": "Default", "rate": 0.1, "default": True}]
     assert rules == [{"id": "rule1"}]
+
+
+def test_get_options_snapshot_cached_until_options_replaced():
+    entry = ConfigEntry(
+        options={
+            "rate_types": [{"id": "default", "name": "Default", "rate": 0.1, "default": True}],
+            "rules": [{"id": "rule1"}],
+        }
+    )
+
+    snapshot = get_options_snapshot(entry)
+
+    assert get_options_snapshot(entry) is snapshot
+    assert snapshot.rate_types_by_id["default"]["rate"] == 0.1
+    assert snapshot.rules_by_id["rule1"] == {"id": "rule1"}
+
+    entry.options = {
+        "rate_types": [{"id": "default", "name": "Default", "rate": 0.2, "default": True}],
+    }
+    updated = get_options_snapshot(entry)
+
+    assert updated is not snapshot
+    assert updated.rate_types_by_id["default"]["rate"] == 0.2
+    assert updated.rules == ()
+
+
+def test_refresh_timings_rolling_percentiles():
+    timings = RefreshTimings(window=100)
+    for value in range(1, 151):
+        timings.record("total", value / 1000)
+
+    stats = timings.stage("total")
+
+    assert stats["count"] == 100
+    assert stats["p50"] == 100
+    assert stats["p95"] == 145
+    assert stats["max"] == 150
+    assert stats["last"] == 150
+    assert timings.stage("prices") is None
+    assert timings.summary() == {"total": stats}
@@ -0,0 +1,386 @@
+from datetime import datetime, timedelta
+
+import pytest
+from homeassistant.const import STATE_UNAVAILABLE
+from homeassistant.exceptions import ServiceValidationError
+from homeassistant.helpers import entity_registry as er
+from homeassistant.util import dt as dt_util
+
+from pytest_homeassistant_custom_component.common import (
+    MockConfigEntry,
+    async_fire_time_changed,
+)
+from pytest_homeassistant_custom_component.components.recorder.common import (
+    async_wait_recording_done,
+)
+
+from custom_components.tou_schedule.const import (
+    ATTR_ACTIVE_RATE_TYPE_ID,
+    ATTR_CHEAPEST_WINDOW,
+    ATTR_NEXT_TRANSITION,
+    CONF_DEFAULT,
+    CONF_END,
+    CONF_ID,
+    CONF_MONTHS,
+    CONF_NAME,
+    CONF_PERIODS,
+    CONF_RATE,
+    CONF_RATE_TYPE,
+    CONF_RATE_TYPES,
+    CONF_REFRESH_MODE,
+    CONF_RULES,
+    CONF_START,
+    CONF_WEEKDAYS,
+    DOMAIN,
+    POLL_INTERVAL,
+    REFRESH_MODE_POLL,
+    WATCHDOG_INTERVAL,
+)
+from custom_components.tou_schedule.diagnostics import (
+    async_get_config_entry_diagnostics,
+)
+
+OPTIONS = {
+    CONF_RATE_TYPES: [
+        {CONF_ID: "default", CONF_NAME: "Default", CONF_RATE: 0.1, CONF_DEFAULT: True},
+        {CONF_ID: "peak", CONF_NAME: "Peak", CONF_RATE: 0.3, CONF_DEFAULT: False},
+    ],
+    CONF_RULES: [
+        {
+            CONF_ID: "rule1",
+            CONF_NAME: "Peak",
+            CONF_RATE_TYPE: "peak",
+            CONF_MONTHS: [],
+            CONF_WEEKDAYS: [],
+            CONF_PERIODS: [{CONF_START: "16:00", CONF_END: "21:00"}],
+        }
+    ],
+}
+
+
+async def _setup_entry(hass, options):
+    entry = MockConfigEntry(domain=DOMAIN, data={}, options=options)
+    entry.add_to_hass(hass)
+    assert await hass.config_entries.async_setup(entry.entry_id) is True
+    await hass.async_block_till_done()
+    return entry, hass.data[DOMAIN][entry.entry_id]
+
+
+@pytest.mark.asyncio
+async def test_coordinator_refreshes_at_transition(hass, enable_custom_integrations, freezer):
+    freezer.move_to(dt_util.as_utc(datetime(2024, 1, 2, 15, 58, 30, tzinfo=dt_util.DEFAULT_TIME_ZONE)))
+    entry, coordinator = await _setup_entry(hass, OPTIONS)
+
+    assert coordinator.update_interval == WATCHDOG_INTERVAL
+    assert coordinator.data[ATTR_ACTIVE_RATE_TYPE_ID] == "default"
+    transition = dt_util.parse_datetime(coordinator.data[ATTR_NEXT_TRANSITION])
+    assert transition.hour == 16 and transition.minute == 0
+
+    freezer.move_to(transition)
+    async_fire_time_changed(hass, transition)
+    await hass.async_block_till_done()
+
+    assert coordinator.data[ATTR_ACTIVE_RATE_TYPE_ID] == "peak"
+
+    assert await hass.config_entries.async_unload(entry.entry_id) is True
+    await hass.async_block_till_done()
+
+
+@pytest.mark.asyncio
+async def test_coordinator_poll_mode(hass, enable_custom_integrations, freezer):
+    # Started mid-minute, so the one minute poll alone would flip 23 s late.
+    freezer.move_to(dt_util.as_utc(datetime(2024, 1, 2, 15, 59, 23, tzinfo=dt_util.DEFAULT_TIME_ZONE)))
+    entry, coordinator = await _setup_entry(
+        hass, {**OPTIONS, CONF_REFRESH_MODE: REFRESH_MODE_POLL}
+    )
+
+    assert coordinator.update_interval == POLL_INTERVAL
+    assert coordinator._unsub_transition is not None
+    assert hass.states.get("binary_sensor.tou_rate_peak").state == "off"
+
+    transition = dt_util.parse_datetime(coordinator.data[ATTR_NEXT_TRANSITION])
+    freezer.move_to(transition)
+    async_fire_time_changed(hass, transition)
+    await hass.async_block_till_done()
+
+    assert hass.states.get("binary_sensor.tou_rate_peak").state == "on"
+
+    assert await hass.config_entries.async_unload(entry.entry_id) is True
+    await hass.async_block_till_done()
+
+
+@pytest.mark.asyncio
+async def test_legacy_unique_ids_are_scoped_to_entry(hass, enable_custom_integrations):
+    entry = MockConfigEntry(domain=DOMAIN, data={}, options=OPTIONS)
+    entry.add_to_hass(hass)
+    registry = er.async_get(hass)
+    legacy = registry.async_get_or_create(
+        "sensor", DOMAIN, "tou_ev_price", config_entry=entry, suggested_object_id="tou_ev_price"
+    )
+
+    assert await hass.config_entries.async_setup(entry.entry_id) is True
+    await hass.async_block_till_done()
+
+    assert registry.async_get(legacy.entity_id).unique_id == f"{entry.entry_id}_ev_price"
+    assert hass.states.get(legacy.entity_id) is not None
+
+    assert await hass.config_entries.async_unload(entry.entry_id) is True
+    await hass.async_block_till_done()
+
+
+@pytest.mark.asyncio
+async def test_unchanged_refresh_skips_listeners(hass, enable_custom_integrations, freezer):
+    # During the peak the cheapest window lies ahead, so nothing changes
+    # between polls.
+    now = dt_util.as_utc(datetime(2024, 1, 2, 16, 30, tzinfo=dt_util.DEFAULT_TIME_ZONE))
+    freezer.move_to(now)
+    options = {**OPTIONS, CONF_REFRESH_MODE: REFRESH_MODE_POLL}
+    entry, coordinator = await _setup_entry(hass, options)
+    updates = []
+    unsub = coordinator.async_add_listener(lambda: updates.append(True))
+    last_updated = hass.states.get("sensor.tou_ev_price").last_updated
+
+    for minute in range(1, 4):
+        freezer.move_to(now + timedelta(minutes=minute))
+        async_fire_time_changed(hass, now + timedelta(minutes=minute))
+        await hass.async_block_till_done()
+
+    assert not updates
+    assert hass.states.get("sensor.tou_ev_price").last_updated == last_updated
+
+    # A rule for another season leaves today's data alone but still reaches
+    # listeners such as offset triggers.
+    summer = {
+        **OPTIONS[CONF_RULES][0],
+        CONF_ID: "rule2",
+        CONF_MONTHS: [7],
+        CONF_PERIODS: [{CONF_START: "10:00", CONF_END: "12:00"}],
+    }
+    hass.config_entries.async_update_entry(
+        entry, options={**options, CONF_RULES: [*OPTIONS[CONF_RULES], summer]}
+    )
+    await hass.async_block_till_done()
+
+    assert updates
+
+    unsub()
+    assert await hass.config_entries.async_unload(entry.entry_id) is True
+    await hass.async_block_till_done()
+
+
+@pytest.mark.asyncio
+async def test_transition_refresh_evaluates_at_boundary(hass, enable_custom_integrations, freezer):
+    boundary = datetime(2024, 1, 2, 16, 0, tzinfo=dt_util.DEFAULT_TIME_ZONE)
+    freezer.move_to(dt_util.as_utc(boundary - timedelta(seconds=1)))
+    entry, coordinator = await _setup_entry(hass, OPTIONS)
+    assert coordinator.data[ATTR_ACTIVE_RATE_TYPE_ID] == "default"
+
+    # A wall clock lagging the timer must not read the rate before the boundary.
+    await coordinator._async_handle_transition(boundary)
+
+    assert coordinator.data[ATTR_ACTIVE_RATE_TYPE_ID] == "peak"
+
+    assert await hass.config_entries.async_unload(entry.entry_id) is True
+    await hass.async_block_till_done()
+
+
+@pytest.mark.asyncio
+async def test_options_update_hot_swaps_entities(hass, enable_custom_integrations):
+    entry, coordinator = await _setup_entry(hass, OPTIONS)
+    registry = er.async_get(hass)
+    reloads = []
+    entry.async_on_unload(lambda: reloads.append(True))
+
+    options = {
+        CONF_RATE_TYPES: [
+            {CONF_ID: "default", CONF_NAME: "Default", CONF_RATE: 0.1, CONF_DEFAULT: True},
+            {CONF_ID: "super", CONF_NAME: "Super Off Peak", CONF_RATE: 0.05, CONF_DEFAULT: False},
+        ],
+        CONF_RULES: [
+            {
+                CONF_ID: "rule2",
+                CONF_NAME: "Night",
+                CONF_RATE_TYPE: "super",
+                CONF_MONTHS: [],
+                CONF_WEEKDAYS: [],
+                CONF_PERIODS: [{CONF_START: "00:00", CONF_END: "06:00"}],
+            }
+        ],
+    }
+    hass.config_entries.async_update_entry(entry, options=options)
+    await hass.async_block_till_done()
+
+    assert not reloads
+    assert hass.data[DOMAIN][entry.entry_id] is coordinator
+    assert coordinator.schedule.rate_types_by_id.keys() == {"default", "super"}
+    assert registry.async_get_entity_id("binary_sensor", DOMAIN, f"{entry.entry_id}_rate_super")
+    assert registry.async_get_entity_id("binary_sensor", DOMAIN, f"{entry.entry_id}_rule_rule2")
+    assert registry.async_get_entity_id("number", DOMAIN, f"{entry.entry_id}_rate_super")
+    assert registry.async_get_entity_id("binary_sensor", DOMAIN, f"{entry.entry_id}_rate_peak") is None
+    assert registry.async_get_entity_id("binary_sensor", DOMAIN, f"{entry.entry_id}_rule_rule1") is None
+    assert registry.async_get_entity_id("number", DOMAIN, f"{entry.entry_id}_rate_peak") is None
+    default_id = registry.async_get_entity_id("binary_sensor", DOMAIN, f"{entry.entry_id}_rate_default")
+    assert hass.states.get(default_id) is not None
+
+    assert await hass.config_entries.async_unload(entry.entry_id) is True
+    await hass.async_block_till_done()
+
+
+@pytest.mark.asyncio
+async def test_get_prices_service(hass, enable_custom_integrations):
+    entry, _ = await _setup_entry(hass, OPTIONS)
+    tzinfo = dt_util.get_time_zone(hass.config.time_zone)
+
+    response = await hass.services.async_call(
+        DOMAIN,
+        "get_prices",
+        {
+            "start": datetime(2024, 1, 1, 0, 0, tzinfo=tzinfo),
+            "end": datetime(2024, 1, 31, 0, 0, tzinfo=tzinfo),
+        },
+        blocking=True,
+        return_response=True,
+    )
+
+    segments = response["segments"]
+    assert len(segments) == 30 * 2 + 1
+    assert segments[1] == {
+        "start": datetime(2024, 1, 1, 16, 0, tzinfo=tzinfo).isoformat(),
+        "end": datetime(2024, 1, 1, 21, 0, tzinfo=tzinfo).isoformat(),
+        "rate_type": "peak",
+        "rate": 0.3,
+    }
+
+    assert await hass.config_entries.async_unload(entry.entry_id) is True
+    await hass.async_block_till_done()
+
+
+@pytest.mark.asyncio
+async def test_calculate_cost_service(hass, enable_custom_integrations):
+    entry, _ = await _setup_entry(hass, OPTIONS)
+    tzinfo = dt_util.get_time_zone(hass.config.time_zone)
+    start = datetime(2024, 1, 1, 15, 0, tzinfo=tzinfo)
+
+    response = await hass.services.async_call(
+        DOMAIN,
+        "calculate_cost",
+        {
+            "readings": [
+                {"timestamp": start.isoformat(), "energy": 1.0},
+                [(start + timedelta(hours=1)).timestamp(), 2.0],
+            ],
+            "interval": {"hours": 1},
+        },
+        blocking=True,
+        return_response=True,
+    )
+
+    assert response["energy"] == pytest.approx(3.0)
+    assert response["cost"] == pytest.approx(0.1 + 0.6)
+    assert response["rate_types"]["peak"] == {
+        "name": "Peak",
+        "energy": pytest.approx(2.0),
+        "cost": pytest.approx(0.6),
+    }
+
+    assert await hass.config_entries.async_unload(entry.entry_id) is True
+    await hass.async_block_till_done()
+
+
+@pytest.mark.asyncio
+@pytest.mark.freeze_time("2024-01-01 20:00:00+00:00")
+async def test_calculate_cost_service_from_meter_history(
+    recorder_mock, hass, enable_custom_integrations, freezer
+):
+    # Time is frozen before the recorder starts, so its run covers the history.
+    tzinfo = dt_util.get_time_zone(hass.config.time_zone)
+    day = datetime(2024, 1, 1, tzinfo=tzinfo)
+    # The reading current at start is clamped to start, the unavailable state
+    # is skipped and the drop to 1 is counted as a meter reset.
+    for hour, value in ((15, "10"), (17, STATE_UNAVAILABLE), (18, "12"), (19, "15"), (20, "1")):
+        freezer.move_to(day.replace(hour=hour))
+        hass.states.async_set("sensor.meter", value)
+    await async_wait_recording_done(hass)
+    entry, _ = await _setup_entry(hass, OPTIONS)
+
+    response = await hass.services.async_call(
+        DOMAIN,
+        "calculate_cost",
+        {
+            "entity_id": "sensor.meter",
+            "start": day.replace(hour=16, minute=30).isoformat(),
+            "end": day.replace(hour=21).isoformat(),
+        },
+        blocking=True,
+        return_response=True,
+    )
+
+    assert response["energy"] == pytest.approx(6.0)
+    assert response["cost"] == pytest.approx(1.8)
+    assert response["rate_types"]["peak"]["energy"] == pytest.approx(6.0)
+
+    with pytest.raises(ServiceValidationError, match="start is required"):
+        await hass.services.async_call(
+            DOMAIN,
+            "calculate_cost",
+            {"entity_id": "sensor.meter"},
+            blocking=True,
+            return_response=True,
+        )
+
+    assert await hass.config_entries.async_unload(entry.entry_id) is True
+    await hass.async_block_till_done()
+
+
+@pytest.mark.asyncio
+async def test_find_cheapest_window_service_and_sensor(hass, enable_custom_integrations):
+    entry, coordinator = await _setup_entry(hass, OPTIONS)
+    tzinfo = dt_util.get_time_zone(hass.config.time_zone)
+    start = datetime(2024, 1, 1, 14, 0, tzinfo=tzinfo)
+
+    response = await hass.services.async_call(
+        DOMAIN,
+        "find_cheapest_window",
+        {"start": start, "end": start + timedelta(hours=10), "duration": {"hours": 3}},
+        blocking=True,
+        return_response=True,
+    )
+
+    assert response["start"] == datetime(2024, 1, 1, 21, 0, tzinfo=tzinfo).isoformat()
+    assert response["average_rate"] == pytest.approx(0.1)
+
+    window = coordinator.data[ATTR_CHEAPEST_WINDOW]
+    assert window.end - window.start == timedelta(hours=3)
+    state = hass.states.get("sensor.tou_cheapest_window")
+    assert state.state == dt_util.as_utc(window.start).isoformat()
+    assert state.attributes["average_rate"] == pytest.approx(0.1)
+    assert er.async_get(hass).async_get_entity_id(
+        "sensor", DOMAIN, f"{entry.entry_id}_cheapest_window"
+    ) == "sensor.tou_cheapest_window"
+
+    assert await hass.config_entries.async_unload(entry.entry_id) is True
+    await hass.async_block_till_done()
+
+
+@pytest.mark.asyncio
+async def test_refresh_timings_and_diagnostics(hass, enable_custom_integrations):
+    entry, coordinator = await _setup_entry(hass, OPTIONS)
+    await coordinator.async_refresh()
+
+    timings = coordinator.timings.summary()
+    assert timings["total"]["count"] == 2
+    assert timings["options"]["count"] == 1
+    assert timings["total"]["p50"] <= timings["total"]["p95"] <= timings["total"]["max"]
+    assert "refresh_timings_ms" not in coordinator.data
+
+    diagnostics = await async_get_config_entry_diagnostics(hass, entry)
+    assert diagnostics["refresh_timings_ms"] == timings
+    assert diagnostics["schedule"]["fingerprint"] == coordinator.schedule.fingerprint
+
+    registry_entry = er.async_get(hass).async_get("sensor.tou_refresh_time")
+    assert registry_entry.unique_id == f"{entry.entry_id}_refresh_time"
+    assert registry_entry.disabled_by is er.RegistryEntryDisabler.INTEGRATION
+    assert hass.states.get("sensor.tou_refresh_time") is None
+
+    assert await hass.config_entries.async_unload(entry.entry_id) is True
+    await hass.async_block_till_done()
@@ -1,7 +1,12 @@
+from datetime import timedelta
+
 import pytest
+from homeassistant.const import EVENT_HOMEASSISTANT_STOP
+from homeassistant.exceptions import ServiceValidationError
 from homeassistant.helpers import entity_registry as er
+from homeassistant.util import dt as dt_util
 
-from pytest_homeassistant_custom_component.common import MockConfigEntry
+from pytest_homeassistant_custom_component.common import MockConfigEntry, async_fire_time_changed
 
 from custom_components.tou_schedule.const import (
     CONF_DEFAULT,
@@ -46,8 +51,124 @@ async def test_rate_type_number_updates_options(hass, enable_custom_integrations
         {"entity_id": peak_entity_id, "value": 0.3},
         blocking=True,
     )
+    async_fire_time_changed(hass, dt_util.utcnow() + timedelta(seconds=5))
+    await hass.async_block_till_done()
+
+    assert entry.options[CONF_RATE_TYPES][1][CONF_RATE] == 0.3
+
+    assert await hass.config_entries.async_unload(entry.entry_id) is True
+    await hass.async_block_till_done()
+
+
+@pytest.mark.asyncio
+async def test_rate_type_number_coalesces_writes(hass, enable_custom_integrations):
+    entry = MockConfigEntry(
+        domain=DOMAIN,
+        data={},
+        options={
+            CONF_RATE_TYPES: [
+                {CONF_ID: "default", CONF_NAME: "Default", CONF_RATE: 0.1, CONF_DEFAULT: True},
+                {CONF_ID: "peak", CONF_NAME: "Peak", CONF_RATE: 0.25, CONF_DEFAULT: False},
+            ]
+        },
+    )
+    entry.add_to_hass(hass)
+    assert await hass.config_entries.async_setup(entry.entry_id) is True
+    await hass.async_block_till_done()
+
+    registry = er.async_get(hass)
+    default_entity_id = registry.async_get_entity_id("number", DOMAIN, f"{entry.entry_id}_rate_default")
+    peak_entity_id = registry.async_get_entity_id("number", DOMAIN, f"{entry.entry_id}_rate_peak")
+    updates = []
+    entry.async_on_unload(entry.add_update_listener(lambda *_: _record(updates)))
+
+    for entity_id, value in ((peak_entity_id, 0.3), (peak_entity_id, 0.35), (default_entity_id, 0.12)):
+        await hass.services.async_call(
+            "number", "set_value", {"entity_id": entity_id, "value": value}, blocking=True
+        )
+    await hass.async_block_till_done()
+
+    assert not updates
+    assert entry.options[CONF_RATE_TYPES][1][CONF_RATE] == 0.25
+    assert float(hass.states.get(peak_entity_id).state) == 0.35
+
+    async_fire_time_changed(hass, dt_util.utcnow() + timedelta(seconds=5))
+    await hass.async_block_till_done()
+
+    assert len(updates) == 1
+    assert entry.options[CONF_RATE_TYPES][0][CONF_RATE] == 0.12
+    assert entry.options[CONF_RATE_TYPES][1][CONF_RATE] == 0.35
+
+    assert await hass.config_entries.async_unload(entry.entry_id) is True
+    await hass.async_block_till_done()
+
+
+@pytest.mark.asyncio
+async def test_rate_type_number_writes_pending_rates_on_stop(hass, enable_custom_integrations):
+    entry = MockConfigEntry(
+        domain=DOMAIN,
+        data={},
+        options={
+            CONF_RATE_TYPES: [
+                {CONF_ID: "default", CONF_NAME: "Default", CONF_RATE: 0.1, CONF_DEFAULT: True},
+                {CONF_ID: "peak", CONF_NAME: "Peak", CONF_RATE: 0.25, CONF_DEFAULT: False},
+            ]
+        },
+    )
+    entry.add_to_hass(hass)
+    assert await hass.config_entries.async_setup(entry.entry_id) is True
+    await hass.async_block_till_done()
+
+    registry = er.async_get(hass)
+    peak_entity_id = registry.async_get_entity_id("number", DOMAIN, f"{entry.entry_id}_rate_peak")
+    await hass.services.async_call(
+        "number", "set_value", {"entity_id": peak_entity_id, "value": 0.3}, blocking=True
+    )
+    await hass.async_block_till_done()
+    assert entry.options[CONF_RATE_TYPES][1][CONF_RATE] == 0.25
+
+    hass.bus.async_fire(EVENT_HOMEASSISTANT_STOP)
+    await hass.async_block_till_done()
 
     assert entry.options[CONF_RATE_TYPES][1][CONF_RATE] == 0.3
 
+
+@pytest.mark.asyncio
+async def test_set_rates_service(hass, enable_custom_integrations):
+    entry = MockConfigEntry(
+        domain=DOMAIN,
+        data={},
+        options={
+            CONF_RATE_TYPES: [
+                {CONF_ID: "default", CONF_NAME: "Default", CONF_RATE: 0.1, CONF_DEFAULT: True},
+                {CONF_ID: "peak", CONF_NAME: "Peak", CONF_RATE: 0.25, CONF_DEFAULT: False},
+            ]
+        },
+    )
+    entry.add_to_hass(hass)
+    assert await hass.config_entries.async_setup(entry.entry_id) is True
+    await hass.async_block_till_done()
+
+    await hass.services.async_call(
+        DOMAIN,
+        "set_rates",
+        {"rates": {"default": 0.11, "peak": 0.31}},
+        blocking=True,
+    )
+    assert entry.options[CONF_RATE_TYPES][0][CONF_RATE] == 0.11
+    assert entry.options[CONF_RATE_TYPES][1][CONF_RATE] == 0.31
+
+    with pytest.raises(ServiceValidationError):
+        await hass.services.async_call(
+            DOMAIN,
+            "set_rates",
+            {"entry_id": entry.entry_id, "rates": {"missing": 0.2}},
+            blocking=True,
+        )
+
     assert await hass.config_entries.async_unload(entry.entry_id) is True
     await hass.async_block_till_done()
+
+
+async def _record(updates):
+    updates.append(True)
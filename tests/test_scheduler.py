@@ -1,8 +1,12 @@
 import importlib.util
+import random
 import sys
 import types
-from datetime import datetime, timezone
+from datetime import datetime, timedelta, timezone
 from pathlib import Path
+from zoneinfo import ZoneInfo
+
+import pytest
 
 ROOT = Path(__file__).resolve().parents[1]
 
@@ -43,10 +47,16 @@ assert spec.loader is not None
 spec.loader.exec_module(scheduler)
 
 ActiveRate = scheduler.ActiveRate
+CompiledSchedule = scheduler.CompiledSchedule
+DayPriceCache = scheduler.DayPriceCache
+ScheduleTable = scheduler.ScheduleTable
 build_prices_for_day = scheduler.build_prices_for_day
+find_active_rule = scheduler.find_active_rule
 get_active_rate = scheduler.get_active_rate
+local_day_start = scheduler.local_day_start
 local_midnight = scheduler.local_midnight
 next_transition = scheduler.next_transition
+rates_for_timestamps = scheduler.rates_for_timestamps
 
 
 def test_get_active_rate_default_when_no_rule():
@@ -110,6 +120,89 @@ def test_build_prices_for_day_hourly():
     assert prices[2]["price"] == 0.1
 
 
+def test_build_prices_for_day_sub_hourly_and_changes():
+    rate_types = [
+        {"id": "default", "name": "Default", "rate": 0.1, "default": True},
+        {"id": "peak", "name": "Peak", "rate": 0.2, "default": False},
+    ]
+    rules = [
+        {
+            "id": "rule1",
+            "name": "Peak",
+            "rate_type": "peak",
+            "months": [],
+            "weekdays": [],
+            "periods": [{"start": "16:30", "end": "21:00"}],
+        }
+    ]
+    day = datetime(2024, 1, 1, 0, 0)
+
+    half_hourly = build_prices_for_day(day, rules, rate_types, timezone.utc, 30)
+    changes = build_prices_for_day(day, rules, rate_types, timezone.utc, None)
+
+    assert len(half_hourly) == 48
+    assert half_hourly[32] == {"time": "2024-01-01T16:00:00+00:00", "price": 0.1}
+    assert half_hourly[33] == {"time": "2024-01-01T16:30:00+00:00", "price": 0.2}
+    assert half_hourly[42]["price"] == 0.1
+    assert len(build_prices_for_day(day, rules, rate_types, timezone.utc, 15)) == 96
+    assert changes == [
+        {"time": "2024-01-01T00:00:00+00:00", "price": 0.1},
+        {"time": "2024-01-01T16:30:00+00:00", "price": 0.2},
+        {"time": "2024-01-01T21:00:00+00:00", "price": 0.1},
+    ]
+
+
+def test_day_price_cache_reuses_lists():
+    rate_types = [{"id": "default", "name": "Default", "rate": 0.1, "default": True}]
+    schedule = CompiledSchedule(rate_types, [])
+    cache = DayPriceCache(maxsize=2)
+    day = datetime(2024, 1, 1, tzinfo=timezone.utc)
+
+    first = cache.prices_for_day(schedule, day, timezone.utc)
+
+    assert cache.prices_for_day(schedule, day, timezone.utc) is first
+    changed = CompiledSchedule(
+        [{"id": "default", "name": "Default", "rate": 0.2, "default": True}], []
+    )
+    assert cache.prices_for_day(changed, day, timezone.utc) is not first
+    cache.prices_for_day(schedule, day + timedelta(days=1), timezone.utc)
+    cache.prices_for_day(schedule, day + timedelta(days=2), timezone.utc)
+    assert cache.prices_for_day(schedule, day, timezone.utc) is not first
+
+
+def test_fingerprint_is_computed_on_first_use():
+    rate_types = [{"id": "default", "name": "Default", "rate": 0.1, "default": True}]
+    schedule = CompiledSchedule(rate_types, [])
+
+    assert "fingerprint" not in vars(schedule)
+    assert schedule.fingerprint == scheduler.schedule_fingerprint(rate_types, [])
+    assert "fingerprint" in vars(schedule)
+
+
+def test_wrappers_reuse_compiled_schedule_until_inputs_change():
+    rate_types = [
+        {"id": "default", "name": "Default", "rate": 0.1, "default": True},
+        {"id": "peak", "name": "Peak", "rate": 0.3, "default": False},
+    ]
+    rules = [
+        {
+            "id": "rule1",
+            "rate_type": "peak",
+            "months": [],
+            "weekdays": [],
+            "periods": [{"start": "16:00", "end": "21:00"}],
+        }
+    ]
+    day = datetime(2024, 1, 1, tzinfo=timezone.utc)
+
+    schedule = scheduler._compiled_schedule(rate_types, rules)
+    assert scheduler._compiled_schedule(rate_types, [dict(rules[0])]) is schedule
+
+    rate_types[1]["rate"] = 0.5
+    assert build_prices_for_day(day, rules, rate_types, timezone.utc)[16]["price"] == 0.5
+    assert scheduler._compiled_schedule(rate_types, rules) is not schedule
+
+
 def test_next_transition_detects_change():
     rate_types = [
         {"id": "default", "name": "Default", "rate": 0.1, "default": True},
@@ -131,6 +224,354 @@ def test_next_transition_detects_change():
     assert result == datetime(2024, 1, 1, 1, 0)
 
 
+def test_compiled_schedule_matches_months_and_weekdays():
+    rate_types = [
+        {"id": "default", "name": "Default", "rate": 0.1, "default": True},
+        {"id": "peak", "name": "Peak", "rate": 0.3, "default": False},
+    ]
+    rules = [
+        {
+            "id": "summer",
+            "name": "Summer Peak",
+            "rate_type": "peak",
+            "months": [6, 7, 8],
+            "weekdays": [0, 1, 2, 3, 4],
+            "periods": [{"start": "16:00", "end": "21:00"}],
+        }
+    ]
+    schedule = CompiledSchedule(rate_types, rules)
+
+    assert schedule.rate_at(datetime(2024, 7, 1, 16, 0)).rule_id == "summer"
+    assert schedule.rate_at(datetime(2024, 7, 1, 21, 0)).rule_id is None
+    assert schedule.rate_at(datetime(2024, 7, 6, 17, 0)).rule_id is None
+    assert schedule.rate_at(datetime(2024, 1, 1, 17, 0)).rule_id is None
+    assert schedule.day_profile(1, 0) is schedule.day_profile(7, 6)
+
+
+def test_compiled_schedule_first_rule_wins():
+    rate_types = [
+        {"id": "default", "name": "Default", "rate": 0.1, "default": True},
+        {"id": "peak", "name": "Peak", "rate": 0.3, "default": False},
+        {"id": "mid", "name": "Mid", "rate": 0.2, "default": False},
+    ]
+    rules = [
+        {
+            "id": "rule1",
+            "name": "Peak",
+            "rate_type": "peak",
+            "periods": [{"start": "10:00", "end": "12:00"}],
+        },
+        {
+            "id": "rule2",
+            "name": "Mid",
+            "rate_type": "mid",
+            "periods": [{"start": "08:00:00", "end": "14:00:00"}],
+        },
+    ]
+    schedule = CompiledSchedule(rate_types, rules)
+
+    for hour in range(24):
+        now = datetime(2024, 3, 5, hour, 30)
+        expected = find_active_rule(rules, now)
+        assert schedule.rate_at(now).rule_id == (expected["id"] if expected else None)
+    assert schedule.rate_at(datetime(2024, 3, 5, 11, 0)).rule_id == "rule1"
+    assert schedule.rate_at(datetime(2024, 3, 5, 13, 0)).rule_id == "rule2"
+
+
+def _scanned_rate(rules, rate_types, now):
+    """Return the rate the original rule scan picks, independent of CompiledSchedule."""
+    rule = find_active_rule(rules, now)
+    if rule is None:
+        return scheduler.default_rate_type(rate_types)["id"], None
+    return scheduler.rate_type_by_id(rate_types, rule["rate_type"])["id"], rule["id"]
+
+
+def _minute_stepping_transition(rules, rate_types, now, limit_hours=48):
+    baseline = _scanned_rate(rules, rate_types, now)
+    current = now.replace(second=0, microsecond=0)
+    for _ in range(limit_hours * 60):
+        current += timedelta(minutes=1)
+        if _scanned_rate(rules, rate_types, current) != baseline:
+            return current
+    return None
+
+
+def _random_rules(rng, count):
+    rules = []
+    for index in range(count):
+        start = rng.randrange(0, 1440, 15)
+        end = min(1440 - 1, start + rng.randrange(15, 600, 15))
+        rules.append(
+            {
+                "id": f"rule{index}",
+                "name": f"Rule {index}",
+                "rate_type": rng.choice(["default", "peak", "mid"]),
+                "months": rng.sample(range(1, 13), rng.randint(0, 4)),
+                "weekdays": rng.sample(range(7), rng.randint(0, 3)),
+                "periods": [
+                    {
+                        "start": f"{start // 60:02d}:{start % 60:02d}",
+                        "end": f"{end // 60:02d}:{end % 60:02d}",
+                    }
+                ],
+            }
+        )
+    return rules
+
+
+def test_next_transition_matches_minute_stepping():
+    rng = random.Random(1234)
+    rate_types = [
+        {"id": "default", "name": "Default", "rate": 0.1, "default": True},
+        {"id": "peak", "name": "Peak", "rate": 0.3, "default": False},
+        {"id": "mid", "name": "Mid", "rate": 0.2, "default": False},
+    ]
+    for _ in range(40):
+        rules = _random_rules(rng, rng.randint(0, 6))
+        schedule = CompiledSchedule(rate_types, rules)
+        for _ in range(10):
+            now = datetime(2024, 1, 1) + timedelta(
+                minutes=rng.randrange(366 * 1440), seconds=rng.randrange(60)
+            )
+            limit_hours = rng.choice([1, 24, 48, 72])
+            assert schedule.next_transition(now, limit_hours) == _minute_stepping_transition(
+                rules, rate_types, now, limit_hours
+            )
+
+
+def test_next_transition_long_horizon():
+    rate_types = [
+        {"id": "default", "name": "Default", "rate": 0.1, "default": True},
+        {"id": "peak", "name": "Peak", "rate": 0.3, "default": False},
+    ]
+    rules = [
+        {
+            "id": "summer",
+            "name": "Summer",
+            "rate_type": "peak",
+            "months": [6],
+            "weekdays": [],
+            "periods": [{"start": "16:00", "end": "21:00"}],
+        }
+    ]
+    schedule = CompiledSchedule(rate_types, rules)
+    now = datetime(2024, 1, 15, 12, 0, tzinfo=timezone.utc)
+
+    assert schedule.next_transition(now) is None
+    assert schedule.next_transition(now, limit_hours=24 * 180) == datetime(
+        2024, 6, 1, 16, 0, tzinfo=timezone.utc
+    )
+
+
+def test_lookup_table_matches_profiles():
+    rng = random.Random(42)
+    rate_types = [
+        {"id": "default", "name": "Default", "rate": 0.1, "default": True},
+        {"id": "peak", "name": "Peak", "rate": 0.3, "default": False},
+        {"id": "mid", "name": "Mid", "rate": 0.2, "default": False},
+    ]
+    for _ in range(20):
+        rules = _random_rules(rng, rng.randint(0, 8))
+        interval = CompiledSchedule(rate_types, rules)
+        table = CompiledSchedule(rate_types, rules, lookup_table=True)
+        assert table.table is not None
+        for _ in range(200):
+            now = datetime(2024, 1, 1) + timedelta(minutes=rng.randrange(366 * 1440))
+            assert table.rate_at(now) == interval.rate_at(now)
+
+
+def test_lookup_table_memory_report_and_fallback():
+    rate_types = [{"id": "default", "name": "Default", "rate": 0.1, "default": True}]
+    schedule = CompiledSchedule(rate_types, [], lookup_table=True)
+
+    report = schedule.table.memory_report()
+
+    assert report["rows"] == 1
+    assert report["rates"] == 1
+    assert report["slot_bytes"] == 1440
+    assert report["dense_bytes"] == 12 * 7 * 1440
+    assert ScheduleTable.build(schedule, memory_budget=100) is None
+
+
+def test_rates_for_timestamps_matches_rate_at():
+    rng = random.Random(7)
+    rate_types = [
+        {"id": "default", "name": "Default", "rate": 0.1, "default": True},
+        {"id": "peak", "name": "Peak", "rate": 0.3, "default": False},
+        {"id": "mid", "name": "Mid", "rate": 0.2, "default": False},
+    ]
+    base = int(datetime(2024, 1, 1, tzinfo=timezone.utc).timestamp())
+    for tzinfo in (timezone.utc, ZoneInfo("Europe/Berlin")):
+        schedule = CompiledSchedule(rate_types, _random_rules(rng, 6))
+        timestamps = [base + rng.randrange(366 * 86400) for _ in range(500)]
+
+        rates, indices = rates_for_timestamps(schedule, timestamps, tzinfo)
+
+        for timestamp, rate, index in zip(timestamps, rates, indices):
+            expected = schedule.rate_at(datetime.fromtimestamp(timestamp, tzinfo))
+            assert rate == expected.rate
+            assert schedule.rate_type_ids[index] == expected.rate_type_id
+
+
+def test_rates_for_timestamps_numpy():
+    np = pytest.importorskip("numpy")
+    rate_types = [
+        {"id": "default", "name": "Default", "rate": 0.1, "default": True},
+        {"id": "peak", "name": "Peak", "rate": 0.3, "default": False},
+        {"id": "mid", "name": "Mid", "rate": 0.2, "default": False},
+    ]
+    schedule = CompiledSchedule(rate_types, _random_rules(random.Random(3), 5))
+    tzinfo = ZoneInfo("America/New_York")
+    timestamps = np.arange(
+        "2024-03-09T00:00", "2024-03-12T00:00", 7, dtype="datetime64[m]"
+    )
+
+    rates, indices = rates_for_timestamps(schedule, timestamps, tzinfo)
+    expected_rates, expected_indices = rates_for_timestamps(
+        schedule, timestamps.astype("datetime64[s]").astype(np.int64).tolist(), tzinfo
+    )
+
+    assert rates.dtype == np.float64
+    assert rates.tolist() == list(expected_rates)
+    assert indices.tolist() == list(expected_indices)
+
+
+def test_iter_segments_merges_across_days():
+    rate_types = [
+        {"id": "default", "name": "Default", "rate": 0.1, "default": True},
+        {"id": "peak", "name": "Peak", "rate": 0.3, "default": False},
+    ]
+    rules = [
+        {
+            "id": "rule1",
+            "name": "Peak",
+            "rate_type": "peak",
+            "months": [],
+            "weekdays": [],
+            "periods": [{"start": "16:00", "end": "21:00"}],
+        }
+    ]
+    schedule = CompiledSchedule(rate_types, rules)
+
+    segments = list(
+        schedule.iter_segments(datetime(2024, 1, 1, 17, 30), datetime(2024, 1, 3, 16, 30))
+    )
+
+    assert [(start, end, rate.rate_type_id) for start, end, rate in segments] == [
+        (datetime(2024, 1, 1, 17, 30), datetime(2024, 1, 1, 21, 0), "peak"),
+        (datetime(2024, 1, 1, 21, 0), datetime(2024, 1, 2, 16, 0), "default"),
+        (datetime(2024, 1, 2, 16, 0), datetime(2024, 1, 2, 21, 0), "peak"),
+        (datetime(2024, 1, 2, 21, 0), datetime(2024, 1, 3, 16, 0), "default"),
+        (datetime(2024, 1, 3, 16, 0), datetime(2024, 1, 3, 16, 30), "peak"),
+    ]
+
+
+def test_iter_segments_matches_rate_at():
+    rng = random.Random(5)
+    rate_types = [
+        {"id": "default", "name": "Default", "rate": 0.1, "default": True},
+        {"id": "peak", "name": "Peak", "rate": 0.3, "default": False},
+        {"id": "mid", "name": "Mid", "rate": 0.2, "default": False},
+    ]
+    for _ in range(20):
+        schedule = CompiledSchedule(rate_types, _random_rules(rng, rng.randint(0, 6)))
+        start = datetime(2024, 1, 1) + timedelta(minutes=rng.randrange(366 * 1440))
+        end = start + timedelta(minutes=rng.randrange(1, 5 * 1440))
+        previous_end = start
+        previous_rate = None
+        for segment_start, segment_end, rate in schedule.iter_segments(start, end):
+            assert segment_start == previous_end < segment_end
+            assert rate != previous_rate
+            assert schedule.rate_at(segment_start) == rate
+            assert schedule.rate_at(segment_end - timedelta(minutes=1)) == rate
+            previous_end, previous_rate = segment_end, rate
+        assert previous_end == end
+
+
+NEW_YORK = ZoneInfo("America/New_York")
+DST_RATE_TYPES = [
+    {"id": "default", "name": "Default", "rate": 0.1, "default": True},
+    {"id": "peak", "name": "Peak", "rate": 0.3, "default": False},
+]
+DST_RULES = [
+    {
+        "id": "night",
+        "name": "Night",
+        "rate_type": "peak",
+        "periods": [{"start": "01:30", "end": "02:30"}],
+    }
+]
+
+
+def test_prices_for_day_on_dst_switch_days():
+    schedule = CompiledSchedule(DST_RATE_TYPES, DST_RULES)
+
+    spring = schedule.prices_for_day(datetime(2024, 3, 10), NEW_YORK)
+    autumn = schedule.prices_for_day(datetime(2024, 11, 3), NEW_YORK)
+
+    assert len(spring) == 23
+    assert [entry["time"][11:] for entry in spring[1:3]] == [
+        "01:00:00-05:00",
+        "03:00:00-04:00",
+    ]
+    assert len(autumn) == 25
+    assert [entry["time"][11:] for entry in autumn[1:4]] == [
+        "01:00:00-04:00",
+        "01:00:00-05:00",
+        "02:00:00-05:00",
+    ]
+    assert len(schedule.prices_for_day(datetime(2024, 11, 3), NEW_YORK, 15)) == 100
+
+
+def test_iter_segments_follow_wall_clock_across_dst():
+    schedule = CompiledSchedule(DST_RATE_TYPES, DST_RULES)
+    for day in (datetime(2024, 3, 10), datetime(2024, 11, 3)):
+        start = local_day_start(day.date(), NEW_YORK)
+        end = local_day_start(day.date() + timedelta(days=1), NEW_YORK)
+
+        segments = list(schedule.iter_segments(start, end))
+
+        instant = start.timestamp()
+        for segment_start, segment_end, rate in segments:
+            assert segment_start.timestamp() == instant
+            while instant < segment_end.timestamp():
+                assert schedule.rate_at(datetime.fromtimestamp(instant, NEW_YORK)) == rate
+                instant += 60
+        assert instant == end.timestamp()
+
+    autumn = list(
+        schedule.iter_segments(
+            local_day_start(datetime(2024, 11, 3).date(), NEW_YORK),
+            local_day_start(datetime(2024, 11, 4).date(), NEW_YORK),
+        )
+    )
+    assert [rate.rate_type_id for _, _, rate in autumn] == [
+        "default",
+        "peak",
+        "default",
+        "peak",
+        "default",
+    ]
+
+
+def test_next_transition_across_dst_gap():
+    schedule = CompiledSchedule(DST_RATE_TYPES, DST_RULES)
+    now = datetime(2024, 3, 10, 1, 45, tzinfo=NEW_YORK)
+
+    change = schedule.next_transition(now)
+
+    assert change.timestamp() == datetime(2024, 3, 10, 7, 0, tzinfo=timezone.utc).timestamp()
+    assert change.utcoffset() == timedelta(hours=-4)
+
+
+def test_local_day_start_when_midnight_is_skipped():
+    santiago = ZoneInfo("America/Santiago")
+
+    start = local_day_start(datetime(2024, 9, 8).date(), santiago)
+
+    assert start.isoformat() == "2024-09-08T01:00:00-03:00"
+
+
 def test_local_midnight():
     value = datetime(2024, 1, 1, 13, 45)
 
@@ -0,0 +1,229 @@
+from datetime import datetime, timedelta
+
+import pytest
+from homeassistant.exceptions import HomeAssistantError, ServiceValidationError
+from homeassistant.helpers import device_registry as dr, entity_registry as er
+from homeassistant.util import dt as dt_util
+
+from pytest_homeassistant_custom_component.common import (
+    MockConfigEntry,
+    async_fire_time_changed,
+)
+
+from custom_components.tou_schedule.const import (
+    CONF_DEFAULT,
+    CONF_END,
+    CONF_ID,
+    CONF_MONTHS,
+    CONF_NAME,
+    CONF_PERIODS,
+    CONF_RATE,
+    CONF_RATE_TYPE,
+    CONF_RATE_TYPES,
+    CONF_RULES,
+    CONF_START,
+    CONF_WEEKDAYS,
+    DATA_TRIGGER_DISPATCHERS,
+    DOMAIN,
+)
+from custom_components.tou_schedule.triggers import (
+    async_attach_trigger,
+    async_validate_trigger_config,
+)
+
+OPTIONS = {
+    CONF_RATE_TYPES: [
+        {CONF_ID: "default", CONF_NAME: "Default", CONF_RATE: 0.1, CONF_DEFAULT: True},
+        {CONF_ID: "peak", CONF_NAME: "Peak", CONF_RATE: 0.3, CONF_DEFAULT: False},
+    ],
+    CONF_RULES: [
+        {
+            CONF_ID: "rule1",
+            CONF_NAME: "Peak",
+            CONF_RATE_TYPE: "peak",
+            CONF_MONTHS: [],
+            CONF_WEEKDAYS: [],
+            CONF_PERIODS: [{CONF_START: "16:00", CONF_END: "21:00"}],
+        }
+    ],
+}
+
+
+def _local(*args):
+    return datetime(*args, tzinfo=dt_util.DEFAULT_TIME_ZONE)
+
+
+async def _setup_entry(hass, options):
+    entry = MockConfigEntry(domain=DOMAIN, data={}, options=options)
+    entry.add_to_hass(hass)
+    assert await hass.config_entries.async_setup(entry.entry_id) is True
+    await hass.async_block_till_done()
+    return entry, hass.data[DOMAIN][entry.entry_id]
+
+
+async def _advance(hass, freezer, when):
+    freezer.move_to(when)
+    async_fire_time_changed(hass, when)
+    await hass.async_block_till_done()
+
+
+async def _attach(hass, config, calls, trigger_info=None):
+    config = await async_validate_trigger_config(hass, {"platform": DOMAIN, **config})
+    return await async_attach_trigger(
+        hass, config, lambda variables, context=None: calls.append(variables), trigger_info or {}
+    )
+
+
+@pytest.mark.asyncio
+async def test_triggers_share_one_dispatcher(hass, enable_custom_integrations, freezer):
+    freezer.move_to(_local(2024, 1, 2, 15, 59))
+    entry, coordinator = await _setup_entry(hass, OPTIONS)
+    listeners = len(coordinator._listeners)
+    peak_entered, any_entered, default_exited, peak_exited = [], [], [], []
+    unsubs = [
+        await _attach(hass, {"event": "rate_entered", "rate_type": "peak"}, peak_entered),
+        await _attach(hass, {"event": "rate_entered"}, any_entered, {"id": "any"}),
+        await _attach(hass, {"event": "rate_exited", "rate_type": "default"}, default_exited),
+        await _attach(hass, {"event": "rate_exited", "rate_type": "peak"}, peak_exited),
+    ]
+
+    assert len(coordinator._listeners) == listeners + 1
+    await _advance(hass, freezer, _local(2024, 1, 2, 16, 0))
+
+    assert [call["trigger"]["rate_type"] for call in peak_entered] == ["peak"]
+    assert [call["trigger"]["rate_type"] for call in any_entered] == ["peak"]
+    assert any_entered[0]["trigger"]["id"] == "any"
+    assert len(default_exited) == 1
+    assert not peak_exited
+
+    for unsub in unsubs:
+        unsub()
+    assert len(coordinator._listeners) == listeners
+    assert entry.entry_id not in hass.data[DATA_TRIGGER_DISPATCHERS]
+
+    assert await hass.config_entries.async_unload(entry.entry_id) is True
+    await hass.async_block_till_done()
+
+
+@pytest.mark.asyncio
+async def test_offset_trigger_fires_before_transition(hass, enable_custom_integrations, freezer):
+    freezer.move_to(_local(2024, 1, 2, 12, 0))
+    entry, coordinator = await _setup_entry(hass, OPTIONS)
+    calls = []
+    config = await async_validate_trigger_config(
+        hass,
+        {"platform": DOMAIN, "event": "rate_entered", "rate_type": "peak", "offset": "-00:15:00"},
+    )
+    unsub = await async_attach_trigger(
+        hass, config, lambda variables, context=None: calls.append(variables), {}
+    )
+
+    await _advance(hass, freezer, _local(2024, 1, 2, 15, 44, 59))
+    assert not calls
+
+    await _advance(hass, freezer, _local(2024, 1, 2, 15, 45))
+    assert len(calls) == 1
+    trigger = calls[0]["trigger"]
+    assert trigger["event"] == "rate_entered"
+    assert trigger["rate_type"] == "peak"
+    assert trigger["offset"] == timedelta(minutes=-15)
+    assert trigger["transition"] == _local(2024, 1, 2, 16, 0)
+
+    await _advance(hass, freezer, _local(2024, 1, 3, 15, 45))
+    assert len(calls) == 2
+    assert calls[1]["trigger"]["transition"] == _local(2024, 1, 3, 16, 0)
+
+    unsub()
+    await _advance(hass, freezer, _local(2024, 1, 4, 15, 45))
+    assert len(calls) == 2
+
+    assert await hass.config_entries.async_unload(entry.entry_id) is True
+    await hass.async_block_till_done()
+
+
+@pytest.mark.asyncio
+async def test_offset_trigger_reschedules_on_schedule_change(
+    hass, enable_custom_integrations, freezer
+):
+    freezer.move_to(_local(2024, 1, 2, 12, 0))
+    entry, coordinator = await _setup_entry(hass, OPTIONS)
+    calls = []
+    config = await async_validate_trigger_config(
+        hass, {"platform": DOMAIN, "event": "period_ended", "offset": "00:05:00"}
+    )
+    unsub = await async_attach_trigger(
+        hass, config, lambda variables, context=None: calls.append(variables), {}
+    )
+
+    rules = [{**OPTIONS[CONF_RULES][0], CONF_PERIODS: [{CONF_START: "13:00", CONF_END: "14:00"}]}]
+    hass.config_entries.async_update_entry(entry, options={**OPTIONS, CONF_RULES: rules})
+    await hass.async_block_till_done()
+
+    await _advance(hass, freezer, _local(2024, 1, 2, 14, 5))
+    assert len(calls) == 1
+    assert calls[0]["trigger"]["transition"] == _local(2024, 1, 2, 14, 0)
+
+    await _advance(hass, freezer, _local(2024, 1, 2, 21, 5))
+    assert len(calls) == 1
+
+    unsub()
+    assert await hass.config_entries.async_unload(entry.entry_id) is True
+    await hass.async_block_till_done()
+
+
+@pytest.mark.asyncio
+async def test_triggers_target_entry_or_device(hass, enable_custom_integrations, freezer):
+    freezer.move_to(_local(2024, 1, 2, 12, 59))
+    first, _ = await _setup_entry(hass, OPTIONS)
+    rules = [{**OPTIONS[CONF_RULES][0], CONF_PERIODS: [{CONF_START: "13:00", CONF_END: "14:00"}]}]
+    second, _ = await _setup_entry(hass, {**OPTIONS, CONF_RULES: rules})
+    device = dr.async_get(hass).async_get_device(identifiers={(DOMAIN, second.entry_id)})
+    first_calls, second_calls = [], []
+    config = {"event": "rate_entered", "rate_type": "peak"}
+
+    registry = er.async_get(hass)
+    for entry in (first, second):
+        for domain, suffix in (("sensor", "ev_price"), ("binary_sensor", "rate_peak")):
+            entity_id = registry.async_get_entity_id(domain, DOMAIN, f"{entry.entry_id}_{suffix}")
+            assert hass.states.get(entity_id) is not None
+    with pytest.raises(HomeAssistantError, match="Multiple"):
+        await _attach(hass, config, [])
+    unsubs = [
+        await _attach(hass, {**config, "entry_id": first.entry_id}, first_calls),
+        await _attach(hass, {**config, "device_id": device.id}, second_calls),
+    ]
+
+    await _advance(hass, freezer, _local(2024, 1, 2, 13, 0))
+    assert not first_calls
+    assert [call["trigger"]["entry_id"] for call in second_calls] == [second.entry_id]
+
+    await _advance(hass, freezer, _local(2024, 1, 2, 16, 0))
+    assert [call["trigger"]["entry_id"] for call in first_calls] == [first.entry_id]
+    assert len(second_calls) == 1
+
+    for unsub in unsubs:
+        unsub()
+    for entry in (first, second):
+        assert await hass.config_entries.async_unload(entry.entry_id) is True
+    await hass.async_block_till_done()
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    ("target", "message"),
+    [
+        ({"entry_id": "missing"}, "Unknown TOU schedule entry"),
+        ({"device_id": "missing"}, "Unknown device"),
+    ],
+)
+async def test_trigger_unknown_target_is_not_a_service_error(
+    hass, enable_custom_integrations, target, message
+):
+    entry, _ = await _setup_entry(hass, OPTIONS)
+
+    with pytest.raises(HomeAssistantError, match=message) as excinfo:
+        await _attach(hass, {"event": "rate_entered", **target}, [])
+    assert not isinstance(excinfo.value, ServiceValidationError)
+
+    assert await hass.config_entries.async_unload(entry.entry_id) is True
+    await hass.async_block_till_done()
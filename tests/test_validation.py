@@ -1,4 +1,5 @@
 import importlib.util
+import random
 import sys
 import types
 from pathlib import Path
@@ -26,6 +27,8 @@ spec.loader.exec_module(validation)
 validate_rate_types = validation.validate_rate_types
 validate_rule_overlaps = validation.validate_rule_overlaps
 validate_rules = validation.validate_rules
+find_rule_conflicts = validation.find_rule_conflicts
+RuleOccupancyIndex = validation.RuleOccupancyIndex
 
 
 def test_validate_rate_types_requires_default():
@@ -48,6 +51,22 @@ def test_validate_rate_types_requires_unique_ids():
     assert not result.valid
 
 
+def test_validate_rules_requires_unique_ids():
+    rate_types = [{"id": "peak", "name": "Peak", "rate": 0.2, "default": True}]
+    rule = {
+        "id": "x",
+        "name": "A",
+        "rate_type": "peak",
+        "periods": [{"start": "01:00", "end": "02:00"}],
+    }
+    other = {**rule, "name": "B", "periods": [{"start": "03:00", "end": "04:00"}]}
+
+    result = validate_rules([rule, other], rate_types, full_report=True)
+
+    assert not result.valid
+    assert result.message == "Rule IDs must be unique."
+
+
 def test_validate_rule_overlap_detects_conflict():
     rules = [
         {
@@ -71,6 +90,64 @@ def test_validate_rule_overlap_detects_conflict():
     assert not result.valid
 
 
+def test_validate_rule_overlaps_full_report():
+    rules = [
+        {
+            "id": "rule1",
+            "name": "Rule 1",
+            "rate_type": "peak",
+            "months": [1, 2],
+            "weekdays": [],
+            "periods": [{"start": "10:00", "end": "12:00"}, {"start": "18:00", "end": "20:00"}],
+        },
+        {
+            "id": "rule2",
+            "name": "Rule 2",
+            "rate_type": "offpeak",
+            "months": [2, 3],
+            "weekdays": [5, 6],
+            "periods": [{"start": "11:00", "end": "19:00"}],
+        },
+        {
+            "id": "rule3",
+            "name": "Rule 3",
+            "rate_type": "offpeak",
+            "months": [1],
+            "weekdays": [0],
+            "periods": [{"start": "11:30", "end": "11:45"}],
+        },
+    ]
+
+    result = validate_rule_overlaps(rules, full_report=True)
+
+    assert not result.valid
+    assert [(c.rule_id, c.other_rule_id) for c in result.conflicts] == [
+        ("rule1", "rule2"),
+        ("rule1", "rule3"),
+    ]
+    first = result.conflicts[0]
+    assert first.months == (2,)
+    assert first.weekdays == (5, 6)
+    assert first.ranges == ((660, 720), (1080, 1140))
+    assert result.conflicts[1].ranges == ((690, 705),)
+    assert "2 conflict(s)" in result.message
+    assert "Rule 1 and Rule 2" in result.message
+
+
+def test_find_rule_conflicts_matches_pairwise():
+    rng = random.Random(11)
+    for _ in range(200):
+        rules = [_random_rule(rng, index) for index in range(rng.randint(1, 6))]
+        expected = {
+            (rules[i]["id"], rules[j]["id"])
+            for i in range(len(rules))
+            for j in range(i + 1, len(rules))
+            if _pairwise_overlaps([rules[i], rules[j]])
+        }
+        conflicts = find_rule_conflicts(rules)
+        assert {(c.rule_id, c.other_rule_id) for c in conflicts} == expected
+
+
 def test_validate_rules_allows_valid():
     rules = [
         {
@@ -85,3 +162,80 @@ def test_validate_rules_allows_valid():
     rate_types = [{"id": "peak", "name": "Peak", "rate": 0.2, "default": True}]
     result = validate_rules(rules, rate_types)
     assert result.valid
+
+
+def _pairwise_overlaps(rules):
+    def minutes(value):
+        hour, minute = value.split(":")[:2]
+        return int(hour) * 60 + int(minute)
+
+    for index, rule in enumerate(rules):
+        for other in rules[index + 1 :]:
+            months = set(rule["months"] or range(1, 13)) & set(other["months"] or range(1, 13))
+            weekdays = set(rule["weekdays"] or range(7)) & set(other["weekdays"] or range(7))
+            if not months or not weekdays:
+                continue
+            for period in rule["periods"]:
+                for other_period in other["periods"]:
+                    if max(minutes(period["start"]), minutes(other_period["start"])) < min(
+                        minutes(period["end"]), minutes(other_period["end"])
+                    ):
+                        return True
+    return False
+
+
+def _random_rule(rng, index):
+    periods = []
+    cursor = rng.randrange(0, 600, 30)
+    for _ in range(rng.randint(1, 3)):
+        end = cursor + rng.randrange(30, 240, 30)
+        if end >= 1440:
+            break
+        periods.append(
+            {
+                "start": f"{cursor // 60:02d}:{cursor % 60:02d}",
+                "end": f"{end // 60:02d}:{end % 60:02d}",
+            }
+        )
+        cursor = end + rng.randrange(0, 180, 30)
+    return {
+        "id": f"rule{index}",
+        "name": f"Rule {index}",
+        "rate_type": "peak",
+        "months": rng.sample(range(1, 13), rng.randint(0, 3)),
+        "weekdays": rng.sample(range(7), rng.randint(0, 3)),
+        "periods": periods,
+    }
+
+
+def test_validate_rule_overlaps_matches_pairwise():
+    rng = random.Random(7)
+    for _ in range(300):
+        rules = [_random_rule(rng, index) for index in range(rng.randint(1, 6))]
+        result = validate_rule_overlaps(rules)
+        assert result.valid is not _pairwise_overlaps(rules)
+
+
+def test_rule_occupancy_index_matches_full_validation():
+    rng = random.Random(3)
+    rate_types = [{"id": "peak", "name": "Peak", "rate": 0.2, "default": True}]
+    for _ in range(200):
+        rules = [_random_rule(rng, index) for index in range(rng.randint(1, 6))]
+        edited = _random_rule(rng, rng.randrange(len(rules) + 1))
+        index = RuleOccupancyIndex(rules, edited["id"])
+        full_rules = [edited if rule["id"] == edited["id"] else rule for rule in rules]
+        if edited["id"] not in {rule["id"] for rule in rules}:
+            full_rules.append(edited)
+
+        expected = validate_rules(full_rules, rate_types, full_report=True)
+        result = index.validate_rule(edited, rate_types, full_report=True)
+
+        assert result.valid is expected.valid
+        if index._consistent:
+            expected_conflicts = {
+                conflict
+                for conflict in expected.conflicts
+                if edited["id"] in (conflict.rule_id, conflict.other_rule_id)
+            }
+            assert set(result.conflicts) == expected_conflicts
+        assert index.validate_rule(edited, rate_types).valid is expected.valid